@@ -1,13 +1,43 @@
 #! /usr/bin/env python3
 # This program is the entry point for our pygame A* visualizer
+# `--bench` runs the headless benchmark suite instead (see videogame/bench.py).
 
 import sys
-import videogame.game
-import pygame
+import time
+import argparse
 
 if __name__ == "__main__":
+    #everything after --bench belongs to the benchmark's own parser
+    if "--bench" in sys.argv[1:]:
+        import videogame.bench
+        sys.exit(videogame.bench.main([arg for arg in sys.argv[1:] if arg != "--bench"]))
+    parser = argparse.ArgumentParser(description="A* pathfinding visualizer.",
+                                     epilog="--bench runs the benchmark suite instead (try --bench --help)")
+    parser.add_argument("--map", help="board to open: a binary map file, or a Moving AI .map")
+    parser.add_argument("--rows", type=int, default=40, help="rows of a fresh board (default 40)")
+    parser.add_argument("--cols", type=int, help="columns of a fresh board (default: same as rows)")
+    parser.add_argument("--stats-log", help="append every run's statistics to this JSON lines file")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report how long imports and setup take, then exit")
+    args = parser.parse_args()
+
+    began = time.perf_counter()
+    import videogame.game
+    imported = time.perf_counter()
+    board = None
+    if args.map:
+        import videogame.mapio
+        board = videogame.mapio.openBoard(args.map)
+    loaded = time.perf_counter()
     window_width = 800
-    window_surface = pygame.display.set_mode((window_width, window_width))
-    CURR_GAME = videogame.game.VideoGame()
-    CURR_GAME.run(window_surface, window_width)
-    sys.exit(0)
\ No newline at end of file
+    #the game opens the window itself
+    CURR_GAME = videogame.game.VideoGame(window_width, window_width)
+    CURR_GAME.stats_log = args.stats_log
+    ready = time.perf_counter()
+    if args.profile_startup:
+        print(f"imports {imported - began:.3f}s, map {loaded - imported:.3f}s, "
+              f"window and font {ready - loaded:.3f}s, total {ready - began:.3f}s")
+        sys.exit(0)
+    import pygame
+    CURR_GAME.run(pygame.display.get_surface(), window_width, board, args.rows, args.cols)
+    sys.exit(0)
@@ -0,0 +1,77 @@
+# Cross-checks every search engine against the wavefront distance field, which is a plain
+# breadth-first sweep and so the ground truth for 4-connected unit-cost boards.
+
+import random
+import pytest
+from videogame.batch import batchQueries
+from videogame.engines import Engine, findPath
+from videogame.flowfield import UNREACHABLE, distanceField
+from videogame.grid import CellState, Grid
+from videogame.search import Algorithm
+
+#HPA* trades optimality for speed, it only has to find a valid path whenever one exists
+OPTIMAL_ENGINES = [engine for engine in Engine if engine != Engine.HPA]
+
+
+def randomBoard(rng, wallChance=0.3):
+    board = Grid(rng.randint(2, 30), rng.randint(2, 30))
+    for index in range(len(board)):
+        if rng.random() < wallChance:
+            board.setState(index, CellState.WALL)
+    start, goal = rng.randrange(len(board)), rng.randrange(len(board))
+    board.setState(start, CellState.EMPTY)
+    board.setState(goal, CellState.EMPTY)
+    return board, start, goal
+
+
+def checkPath(board, start, goal, result, exact):
+    truth = distanceField(board, goal)[start]
+    if truth == UNREACHABLE:
+        assert not result.found
+        return
+    assert result.found
+    path = result.path
+    assert path[0] == start and path[-1] == goal
+    assert len(path) == result.cost + 1
+    assert not any(board.isWall(index) for index in path)
+    assert all(abs(a - b) == 1 and a // board.cols == b // board.cols or abs(a - b) == board.cols
+               for a, b in zip(path, path[1:]))
+    if exact:
+        assert result.cost == truth
+    else:
+        assert result.cost >= truth
+
+
+@pytest.mark.parametrize("distance", list(Algorithm))
+@pytest.mark.parametrize("engine", list(Engine))
+def test_engine_matches_distance_field(engine, distance):
+    rng = random.Random(engine.value * 10 + distance.value)
+    for _ in range(40):
+        board, start, goal = randomBoard(rng)
+        checkPath(board, start, goal, findPath(board, start, goal, distance, engine), engine in OPTIMAL_ENGINES)
+
+
+@pytest.mark.parametrize("distance", list(Algorithm))
+@pytest.mark.parametrize("engine", [Engine.LPA, Engine.HPA])
+def test_engine_after_wall_toggles(engine, distance):
+    #both keep state on the grid between runs and have to follow the wall edits
+    rng = random.Random(100 + engine.value * 10 + distance.value)
+    for _ in range(20):
+        board, start, goal = randomBoard(rng, 0.25)
+        for _ in range(6):
+            checkPath(board, start, goal, findPath(board, start, goal, distance, engine), engine == Engine.LPA)
+            for _ in range(rng.randint(1, 3)):
+                index = rng.randrange(len(board))
+                if index not in (start, goal):
+                    board.setState(index, CellState.EMPTY if board.isWall(index) else CellState.WALL)
+
+
+def test_batch_matches_serial():
+    rng = random.Random(7)
+    board, _, _ = randomBoard(rng, 0.2)
+    queries = [(rng.randrange(len(board)), rng.randrange(len(board))) for _ in range(100)]
+    queries = [(start, goal) for start, goal in queries if not board.isWall(start) and not board.isWall(goal)]
+    results = list(batchQueries(board, queries, workers=2, chunkSize=8))
+    assert sorted((start, goal) for start, goal, _ in results) == sorted(queries)
+    for start, goal, result in results:
+        assert result.cost == findPath(board, start, goal).cost
@@ -1,3 +1,3 @@
 # This is the init file
 
-__all__ = ["game", "rgbcolors"]
\ No newline at end of file
+__all__ = ["anytime", "batch", "bench", "cache", "camera", "engines", "flowfield", "game", "grid", "hpa", "incremental", "instrument", "jps", "landmarks", "mapio", "openlist", "rgbcolors", "search"]
\ No newline at end of file
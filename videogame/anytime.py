@@ -0,0 +1,109 @@
+# This is the anytime search file
+# ARA* (Likhachev, Gordon & Thrun): weighted A* with a heuristic weight that starts
+# high, so a first path shows up quickly, and is lowered after every solution. Each
+# round reuses the previous round's costs instead of starting over, and the search can
+# be cut off by a time budget, handing back the best path found so far.
+
+import time
+from itertools import chain
+from videogame.openlist import OpenList
+from videogame.search import Algorithm, SearchResult, heuristicArray, neighbors, reconstructPath
+
+DEFAULT_WEIGHT = 3.0
+DEFAULT_WEIGHT_STEP = 0.5
+
+
+class AnytimeSearch:
+    """One ARA* query. steps() does the work; weight, path, cost and bound follow its progress."""
+    def __init__(self, grid, start, goal, distance=Algorithm.MANHATTAN, weight=DEFAULT_WEIGHT,
+                 weightStep=DEFAULT_WEIGHT_STEP, budget=None):
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        self.distance = distance
+        self.weightStep = weightStep
+        #seconds of search time after which the best path so far is returned, None to run until optimal
+        self.budget = budget
+        self.weight = weight
+        #best path so far, its cost, and how far above the optimal cost it can be at most
+        self.path = None
+        self.cost = float("inf")
+        self.bound = float("inf")
+        #how many times a better path has been published
+        self.solutions = 0
+
+    def steps(self):
+        """Step generator with the search.astarSteps contract, each round's expansions in turn."""
+        grid = self.grid
+        start, goal = self.start, self.goal
+        heuristic = memoryview(heuristicArray(grid, goal, self.distance))
+        moves = memoryview(grid.moves)
+        cols = grid.cols
+        inf = float("inf")
+        pathCost = {start: 0}
+        previous = {}
+        frontier = OpenList()
+        frontier.push(start, self.weight * heuristic[start])
+        closed = set()
+        #cells that got cheaper after being closed this round, they go back in next round
+        inconsistent = set()
+        expanded = 0
+        pushes = 1
+        peak_frontier = 1
+        reopens = 0
+        #the budget only counts time spent in here, not whatever the caller does between steps
+        spent = 0
+        resumed = time.perf_counter()
+        while True:
+            weight = self.weight
+            while frontier and pathCost.get(goal, inf) > frontier.peekPriority():
+                if self.budget is not None and spent + time.perf_counter() - resumed > self.budget:
+                    return SearchResult(self.path, self.cost, expanded, pushes, peak_frontier, reopens)
+                currNode = frontier.pop()
+                closed.add(currNode)
+                expanded += 1
+                opened = []
+                for adjacent in neighbors(moves, cols, currNode):
+                    temp_pathCost = pathCost[currNode] + 1
+                    if temp_pathCost < pathCost.get(adjacent, inf):
+                        previous[adjacent] = currNode
+                        pathCost[adjacent] = temp_pathCost
+                        if adjacent in closed:
+                            #ARA* holds these back for the next round instead of reopening them now
+                            inconsistent.add(adjacent)
+                            continue
+                        newlyOpened = adjacent not in frontier
+                        frontier.push(adjacent, temp_pathCost + weight * heuristic[adjacent])
+                        pushes += 1
+                        if newlyOpened:
+                            peak_frontier = max(peak_frontier, len(frontier))
+                            opened.append(adjacent)
+                spent += time.perf_counter() - resumed
+                yield currNode, opened
+                resumed = time.perf_counter()
+
+            if pathCost.get(goal, inf) < self.cost:
+                self.cost = pathCost[goal]
+                self.path = reconstructPath(previous, goal)
+                self.solutions += 1
+            #nothing left open can lead to a path cheaper than this lower bound
+            lower = min((pathCost[index] + heuristic[index] for index in chain(frontier, inconsistent)), default=inf)
+            if self.path is not None:
+                self.bound = 1.0 if lower >= self.cost else min(weight, self.cost / lower)
+            if weight <= 1 or self.bound <= 1 or not (frontier or inconsistent):
+                break
+            #next round: lower the weight and reopen everything left over under the new priorities
+            self.weight = max(1.0, weight - self.weightStep)
+            reopened = OpenList()
+            for index in chain(frontier, inconsistent):
+                reopened.push(index, pathCost[index] + self.weight * heuristic[index])
+            frontier = reopened
+            reopens += len(inconsistent)
+            inconsistent = set()
+            closed = set()
+
+        return SearchResult(self.path, self.cost, expanded, pushes, peak_frontier, reopens)
+
+
+def araSteps(grid, start, goal, distance=Algorithm.MANHATTAN):
+    return AnytimeSearch(grid, start, goal, distance).steps()
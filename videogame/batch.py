@@ -0,0 +1,92 @@
+# This is the batch query file
+# Answers many (start, goal) queries on one board with a pool of worker processes.
+# The board's cells and move masks are copied once into shared memory; every worker
+# maps the same bytes as a read-only Grid when it starts, so queries only send indices
+# across and only the SearchResults come back.
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+from videogame import engines
+from videogame.engines import Engine
+from videogame.grid import Grid
+from videogame.search import Algorithm
+
+#queries handed to a worker at a time, enough to keep the round trips cheap
+DEFAULT_CHUNK_SIZE = 64
+
+
+class SharedGrid:
+    """Snapshot of a Grid's cells and moves in shared memory; use it as a context manager."""
+    def __init__(self, grid):
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self._blocks = []
+        for source in (grid.cells, grid.moves):
+            block = shared_memory.SharedMemory(create=True, size=max(1, source.nbytes))
+            np.ndarray(source.shape, dtype=np.uint8, buffer=block.buf)[:] = source
+            self._blocks.append(block)
+
+    @property
+    def spec(self):
+        #all a worker needs to find the board again
+        return self.rows, self.cols, self._blocks[0].name, self._blocks[1].name
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+#Worker side, one board per process
+_worker_grid = None
+_worker_blocks = []
+
+
+def _attach(spec):
+    #pool initializer: wrap the shared buffers in a Grid without copying them
+    global _worker_grid
+    rows, cols, cellsName, movesName = spec
+    arrays = []
+    for name in (cellsName, movesName):
+        #workers share the parent's resource tracker, so the parent alone unlinks the blocks
+        block = shared_memory.SharedMemory(name=name)
+        _worker_blocks.append(block)
+        arrays.append(np.ndarray(rows * cols, dtype=np.uint8, buffer=block.buf))
+    _worker_grid = Grid(rows, cols, cells=arrays[0], moves=arrays[1])
+
+
+def _solve(queries, distance, engine):
+    return [(start, goal, engines.findPath(_worker_grid, start, goal, distance, engine))
+            for start, goal in queries]
+
+
+def batchQueries(grid, queries, distance=Algorithm.MANHATTAN, engine=Engine.ASTAR, workers=None,
+                 chunkSize=DEFAULT_CHUNK_SIZE):
+    """Yield (start, goal, SearchResult) for every query, in the order they finish.
+
+    The workers see the board as it was when the batch started; wall edits made
+    while the batch runs are not picked up.
+    """
+    queries = list(queries)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with SharedGrid(grid) as shared:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shared.spec,))
+        try:
+            futures = [pool.submit(_solve, queries[first:first + chunkSize], distance, engine)
+                       for first in range(0, len(queries), chunkSize)]
+            for future in as_completed(futures):
+                yield from future.result()
+        finally:
+            #a caller that stops reading early shouldn't wait for the chunks nobody will see,
+            #and the workers must be gone before the shared blocks are unlinked
+            pool.shutdown(wait=True, cancel_futures=True)
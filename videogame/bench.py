@@ -0,0 +1,345 @@
+# This is the benchmark file
+# Seeded maps, every heuristic and engine, JSON out, and a baseline to compare against.
+# Run it with `python pathfinding.py --bench` (add --help for the options).
+# Nothing here touches pygame, it only times the headless search.
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from queue import PriorityQueue
+import numpy as np
+from videogame import grid
+from videogame.grid import CellState
+from videogame import engines
+from videogame import flowfield
+from videogame import hpa
+from videogame import incremental
+from videogame import landmarks
+from videogame.openlist import OpenList
+from videogame.engines import Engine
+from videogame.search import Algorithm
+
+MAP_KINDS = ("open", "walls10", "walls20", "walls30", "maze", "unreachable")
+DEFAULT_SIZES = (40, 200, 1000)
+#a run counts as a regression when it is this much slower than the baseline
+DEFAULT_TOLERANCE = 0.25
+#...and at least this many seconds slower, so timer noise on tiny runs doesn't count
+DEFAULT_MIN_DELTA = 0.005
+#every timing is the fastest of this many runs
+DEFAULT_REPEATS = 3
+
+
+#Map generation, every map runs from the top left corner to the bottom right one.
+def openMap(size):
+    return grid.Grid(size)
+
+def randomWalls(size, density, seed):
+    board = grid.Grid(size)
+    rng = np.random.default_rng(seed)
+    board.cells[rng.random(size * size) < density] = CellState.WALL
+    board.rebuildMoves()
+    return board
+
+def maze(size, seed):
+    #binary tree maze: every room on the odd lattice knocks through either north or west,
+    #which makes a perfect maze and vectorizes nicely even at 4000 x 4000.
+    board = grid.Grid(size)
+    cells = board.view()
+    cells[:] = CellState.WALL
+    rng = np.random.default_rng(seed)
+    rows, cols = np.meshgrid(np.arange(1, size, 2), np.arange(1, size, 2), indexing="ij")
+    cells[rows, cols] = CellState.EMPTY
+    north = rng.random(rows.shape) < 0.5
+    #the first lattice row can only go west and the first lattice column only north
+    north[0, :] = False
+    north[:, 0] = True
+    north[0, 0] = False
+    cells[rows[north] - 1, cols[north]] = CellState.EMPTY
+    west = ~north
+    west[0, 0] = False
+    cells[rows[west], cols[west] - 1] = CellState.EMPTY
+    #hook the corners up to the maze
+    cells[0, 0] = cells[0, 1] = cells[1, 0] = CellState.EMPTY
+    cells[size - 1, size - 1] = cells[size - 2, size - 1] = cells[size - 1, size - 2] = CellState.EMPTY
+    board.rebuildMoves()
+    return board
+
+def unreachable(size, seed):
+    #sparse walls everywhere plus a closed ring around the goal
+    board = randomWalls(size, 0.1, seed)
+    cells = board.view()
+    cells[size - 3, size - 3:] = CellState.WALL
+    cells[size - 3:, size - 3] = CellState.WALL
+    board.rebuildMoves()
+    return board
+
+def makeMap(kind, size, seed=0):
+    if kind == "open":
+        board = openMap(size)
+    elif kind.startswith("walls"):
+        board = randomWalls(size, int(kind[5:]) / 100, seed)
+    elif kind == "maze":
+        board = maze(size, seed)
+    elif kind == "unreachable":
+        board = unreachable(size, seed)
+    else:
+        raise ValueError(f"Unknown map kind: {kind}")
+    if kind.startswith("walls"):
+        #keep random walls from boxing the corners in by chance
+        cells = board.view()
+        cells[:2, :2] = CellState.EMPTY
+        cells[-2:, -2:] = CellState.EMPTY
+        board.rebuildMoves()
+    start, goal = 0, size * size - 1
+    board.setState(start, CellState.EMPTY)
+    board.setState(goal, CellState.EMPTY)
+    return board, start, goal
+
+
+def _discardQueryState(board, engine):
+    #engines that keep per-query work on the board would answer a repeat from it
+    if engine == Engine.LPA:
+        incremental.discardPlanner(board)
+    elif engine == Engine.FLOW:
+        flowfield.discardFlowField(board)
+
+
+def measure(board, start, goal, distance, memory=True, engine=Engine.ASTAR, repeats=DEFAULT_REPEATS):
+    #the fastest of several runs, the others only add scheduler and cache noise
+    seconds = float("inf")
+    for _ in range(max(1, repeats)):
+        _discardQueryState(board, engine)
+        began = time.perf_counter()
+        result = engines.findPath(board, start, goal, distance, engine)
+        seconds = min(seconds, time.perf_counter() - began)
+    row = {
+        "seconds": round(seconds, 6),
+        "found": result.found,
+        "cost": result.cost if result.found else None,
+        "expanded": result.expanded,
+        "pushes": result.pushes,
+        "peak_frontier": result.peak_frontier,
+        "reopens": result.reopens,
+    }
+    if memory:
+        #tracemalloc slows allocation down a lot, so memory gets its own untimed run
+        _discardQueryState(board, engine)
+        tracemalloc.start()
+        engines.findPath(board, start, goal, distance, engine)
+        row["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return row
+
+
+def measureReplan(board, start, goal, distance):
+    #wall off the middle of the path and time LPA*'s repair against the first plan
+    path = incremental.plannerFor(board, start, goal, distance).replan().path
+    blocked = path[len(path) // 2]
+    board.setState(blocked, CellState.WALL)
+    began = time.perf_counter()
+    result = engines.findPath(board, start, goal, distance, Engine.LPA)
+    row = {"replan_seconds": round(time.perf_counter() - began, 6), "replan_expanded": result.expanded}
+    board.setState(blocked, CellState.EMPTY)
+    return row
+
+
+def runSuite(sizes=DEFAULT_SIZES, kinds=MAP_KINDS, heuristics=tuple(Algorithm), seed=0, memory=True, log=None,
+             engineList=tuple(Engine), repeats=DEFAULT_REPEATS):
+    results = []
+    for size in sizes:
+        for kind in kinds:
+            board, start, goal = makeMap(kind, size, seed)
+            for distance in heuristics:
+                astarCost = None
+                if distance == Algorithm.LANDMARK:
+                    #landmark tables are built once per board, like HPA*'s clusters
+                    began = time.perf_counter()
+                    landmarks.landmarksFor(board)
+                    landmarkSeconds = round(time.perf_counter() - began, 6)
+                for engine in engineList:
+                    row = {"map": kind, "size": size, "heuristic": distance.name, "engine": engine.name}
+                    if distance == Algorithm.LANDMARK:
+                        row["preprocess_seconds"] = landmarkSeconds
+                        #LPA*'s replan check toggles a wall, keep the rebuild that causes out of the timings
+                        landmarks.landmarksFor(board)
+                    if engine == Engine.HPA:
+                        #one-off cluster preprocessing is reported apart from the query itself
+                        began = time.perf_counter()
+                        hpa.hierarchyFor(board).preprocess()
+                        row["preprocess_seconds"] = round(row.get("preprocess_seconds", 0) + time.perf_counter() - began, 6)
+                    row.update(measure(board, start, goal, distance, memory, engine, repeats))
+                    if engine == Engine.LPA and row["found"] and row["cost"] > 1:
+                        row.update(measureReplan(board, start, goal, distance))
+                    #engines should agree with plain A* on what the shortest path costs (HPA* may come in a little over)
+                    if engine == Engine.ASTAR:
+                        astarCost = row["cost"]
+                    elif Engine.ASTAR in engineList:
+                        row["cost_matches_astar"] = row["cost"] == astarCost
+                    results.append(row)
+                    if log:
+                        print(json.dumps(row), file=log, flush=True)
+    return results
+
+
+def _key(row):
+    #reports from before engines existed only ever ran A*
+    return row["map"], row["size"], row["heuristic"], row.get("engine", Engine.ASTAR.name)
+
+def compareToBaseline(results, baseline, tolerance=DEFAULT_TOLERANCE, minDelta=DEFAULT_MIN_DELTA):
+    #slower beyond the tolerance (and by more than minDelta seconds), or more expansions at all,
+    #counts as a regression
+    previous = {_key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        old = previous.get(_key(row))
+        if old is None:
+            continue
+        reasons = []
+        slower = row["seconds"] - old["seconds"]
+        if row["seconds"] > old["seconds"] * (1 + tolerance) and slower > minDelta:
+            reasons.append(f"seconds {old['seconds']} -> {row['seconds']}")
+        if row["expanded"] > old["expanded"]:
+            reasons.append(f"expanded {old['expanded']} -> {row['expanded']}")
+        if reasons:
+            regressions.append({"map": row["map"], "size": row["size"], "heuristic": row["heuristic"],
+                                "engine": row["engine"], "reasons": reasons})
+    return regressions
+
+
+#Open list comparison: the same A* frontier workload run through the old
+#queue.PriorityQueue + frontier_hash pattern and through OpenList.
+def _openNeighbors(index, size):
+    row, col = divmod(index, size)
+    if row > 0:
+        yield index - size
+    if row < size - 1:
+        yield index + size
+    if col > 0:
+        yield index - 1
+    if col < size - 1:
+        yield index + 1
+
+
+def _priorityQueueRun(size, start, goal):
+    #the pre-OpenList frontier: locked queue, no decrease-key
+    goalRow, goalCol = divmod(goal, size)
+    frontier = PriorityQueue()
+    frontier.put((0, 0, start))
+    frontier_hash = {start}
+    pathCost = {start: 0}
+    count = pops = 0
+    while not frontier.empty():
+        currNode = frontier.get()[2]
+        frontier_hash.remove(currNode)
+        pops += 1
+        if currNode == goal:
+            break
+        for adjacent in _openNeighbors(currNode, size):
+            temp_pathCost = pathCost[currNode] + 1
+            if temp_pathCost < pathCost.get(adjacent, float("inf")):
+                pathCost[adjacent] = temp_pathCost
+                if adjacent not in frontier_hash:
+                    count += 1
+                    row, col = divmod(adjacent, size)
+                    frontier.put((temp_pathCost + abs(row - goalRow) + abs(col - goalCol), count, adjacent))
+                    frontier_hash.add(adjacent)
+    return pops
+
+
+def _openListRun(size, start, goal):
+    goalRow, goalCol = divmod(goal, size)
+    frontier = OpenList()
+    frontier.push(start, 0)
+    pathCost = {start: 0}
+    pops = 0
+    while frontier:
+        currNode = frontier.pop()
+        pops += 1
+        if currNode == goal:
+            break
+        for adjacent in _openNeighbors(currNode, size):
+            temp_pathCost = pathCost[currNode] + 1
+            if temp_pathCost < pathCost.get(adjacent, float("inf")):
+                pathCost[adjacent] = temp_pathCost
+                row, col = divmod(adjacent, size)
+                frontier.push(adjacent, temp_pathCost + abs(row - goalRow) + abs(col - goalCol))
+    return pops
+
+
+def compareOpenLists(sizes=(100, 300, 600)):
+    #open grids from the middle of the left edge to the far corner, so the frontier gets wide
+    results = []
+    for size in sizes:
+        start, goal = (size // 2) * size, size * size - 1
+        row = {"size": size}
+        for name, run in (("PriorityQueue", _priorityQueueRun), ("OpenList", _openListRun)):
+            began = time.perf_counter()
+            pops = run(size, start, goal)
+            row[name] = {"seconds": round(time.perf_counter() - began, 4), "pops": pops}
+        results.append(row)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="pathfinding.py --bench", description="Benchmark the headless search.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma separated board sizes, e.g. 40,400,4000")
+    parser.add_argument("--maps", default=",".join(MAP_KINDS), help="comma separated map kinds")
+    parser.add_argument("--heuristics", default=",".join(a.name for a in Algorithm),
+                        help="comma separated Algorithm names")
+    parser.add_argument("--engines", default=",".join(e.name for e in Engine),
+                        help="comma separated Engine names")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak memory runs")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="compare against a saved report, exit 1 on regressions")
+    parser.add_argument("--save-baseline", help="also write the report here for future comparisons")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="slowdowns smaller than this many seconds never count (default %(default)s)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                        help="time the fastest of this many runs (default %(default)s)")
+    parser.add_argument("--compare-open-lists", action="store_true",
+                        help="only run the PriorityQueue vs OpenList comparison")
+    args = parser.parse_args(argv)
+
+    if args.compare_open_lists:
+        print(json.dumps(compareOpenLists(), indent=2))
+        return 0
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    kinds = args.maps.split(",")
+    heuristics = [Algorithm[name.strip().upper()] for name in args.heuristics.split(",")]
+    engineList = [Engine[name.strip().upper()] for name in args.engines.split(",")]
+    #rows stream to stderr as they finish so long runs show progress
+    results = runSuite(sizes, kinds, heuristics, args.seed, not args.no_memory, log=sys.stderr, engineList=engineList,
+                       repeats=args.repeats)
+    report = {
+        "meta": {"python": platform.python_version(), "machine": platform.machine(), "seed": args.seed},
+        "results": results,
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report["regressions"] = compareToBaseline(results, json.load(baseline_file), args.tolerance,
+                                                         args.min_delta)
+        status = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as baseline_file:
+            baseline_file.write(text + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
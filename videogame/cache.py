@@ -0,0 +1,70 @@
+# This is the path cache file
+# Re-running the same query on an unchanged board shouldn't search again. Results are
+# kept in a bounded LRU keyed by (start, goal, heuristic, engine, board version); the
+# grid takes a new process-wide unique version on every wall change, so stale entries
+# (and other boards' entries) just stop matching
+# and age out.
+
+import sys
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def resultSize(result):
+    #rough footprint of a cached SearchResult: the path list plus one int object per cell
+    path = result.path or []
+    return sys.getsizeof(result) + sys.getsizeof(path) + len(path) * sys.getsizeof(0)
+
+
+class PathCache:
+    """Least recently used SearchResults, bounded by entry count and approximate bytes."""
+    def __init__(self, maxEntries=DEFAULT_MAX_ENTRIES, maxBytes=DEFAULT_MAX_BYTES):
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        #key -> (result, size), oldest first
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(grid, start, goal, distance, engine):
+        return start, goal, distance, engine, grid.version
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, result):
+        size = resultSize(result)
+        if size > self.maxBytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[key] = (result, size)
+        self.bytes += size
+        #drop least recently used entries until both limits hold
+        while len(self._entries) > self.maxEntries or self.bytes > self.maxBytes:
+            _, (_, evictedSize) = self._entries.popitem(last=False)
+            self.bytes -= evictedSize
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,87 @@
+# This is the viewport camera file
+# Maps board cells to window pixels and back for a board that may be far bigger than the
+# window. The camera has a cell size (zoom) and a pan offset; only the cells inside the
+# viewport are ever drawn, so a frame costs what's visible, not what's on the board.
+# Like the original layout, board rows run along x and columns along y.
+
+#cells are never drawn smaller than this or larger than this many pixels
+MIN_CELL_SIZE = 1
+MAX_CELL_SIZE = 64
+
+
+class Camera:
+    """Pan/zoom transform between a rows x cols board and a rectangle of the window."""
+    def __init__(self, rows, cols, left, top, width, height):
+        self.rows = rows
+        self.cols = cols
+        #the window rectangle the board is drawn into
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+        self.cellSize = MIN_CELL_SIZE
+        #board pixel shown at the viewport's top left corner
+        self.panX = 0
+        self.panY = 0
+        self.fit()
+
+    def fit(self):
+        #largest zoom that shows the whole board, or the smallest cells if it can't fit
+        self.cellSize = min(MAX_CELL_SIZE, max(MIN_CELL_SIZE, min(self.width // self.rows, self.height // self.cols)))
+        self.panX = self.panY = 0
+        self._clamp()
+
+    @property
+    def viewport(self):
+        return self.left, self.top, self.width, self.height
+
+    def _clamp(self):
+        #keep the board from being dragged off screen entirely
+        self.panX = max(0, min(self.panX, self.rows * self.cellSize - self.width))
+        self.panY = max(0, min(self.panY, self.cols * self.cellSize - self.height))
+
+    def pan(self, dx, dy):
+        self.panX += dx
+        self.panY += dy
+        self._clamp()
+
+    def zoom(self, factor, anchor=None):
+        """Scale the cell size by factor, keeping the board point under anchor (window x, y) still."""
+        if anchor is None:
+            anchor = (self.left + self.width // 2, self.top + self.height // 2)
+        size = min(MAX_CELL_SIZE, max(MIN_CELL_SIZE, round(self.cellSize * factor)))
+        if size == self.cellSize and factor != 1:
+            #rounding swallowed the change, step one pixel instead
+            size = min(MAX_CELL_SIZE, max(MIN_CELL_SIZE, self.cellSize + (1 if factor > 1 else -1)))
+        offsetX, offsetY = anchor[0] - self.left, anchor[1] - self.top
+        boardX = (self.panX + offsetX) / self.cellSize
+        boardY = (self.panY + offsetY) / self.cellSize
+        self.cellSize = size
+        self.panX = round(boardX * size - offsetX)
+        self.panY = round(boardY * size - offsetY)
+        self._clamp()
+
+    def visible(self):
+        """(first row, row end, first col, col end) of the cells at least partly in view."""
+        size = self.cellSize
+        return (self.panX // size, min(self.rows, -(-(self.panX + self.width) // size)),
+                self.panY // size, min(self.cols, -(-(self.panY + self.height) // size)))
+
+    def cellRect(self, row, col):
+        #window rectangle of a cell, may stick out of the viewport at the edges
+        size = self.cellSize
+        return self.left + row * size - self.panX, self.top + col * size - self.panY, size, size
+
+    def cellAt(self, x, y):
+        """(row, col) of the cell under window pixel (x, y), None outside the viewport or board."""
+        if not (self.left <= x < self.left + self.width and self.top <= y < self.top + self.height):
+            return None
+        row = (x - self.left + self.panX) // self.cellSize
+        col = (y - self.top + self.panY) // self.cellSize
+        if row < self.rows and col < self.cols:
+            return row, col
+        return None
+
+    def key(self):
+        #everything the picture of the grid lines depends on
+        return self.cellSize, self.panX, self.panY, self.viewport, self.rows, self.cols
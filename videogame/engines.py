@@ -0,0 +1,57 @@
+# This is the search engine selection file
+# The Algorithm enum picks the heuristic, Engine picks the search that uses it.
+# Everything here has the step generator contract from videogame.search.
+
+from enum import Enum
+from videogame import anytime
+from videogame import flowfield
+from videogame import hpa
+from videogame import incremental
+from videogame import jps
+from videogame import search
+from videogame.search import Algorithm
+
+
+class Engine(Enum):
+    ASTAR = 0
+    JPS = 1
+    BIDIRECTIONAL = 2
+    HPA = 3
+    LPA = 4
+    FLOW = 5
+    ARA = 6
+
+
+def searchSteps(grid, start, goal, distance=Algorithm.MANHATTAN, engine=Engine.ASTAR):
+    if engine == Engine.ASTAR:
+        return search.astarSteps(grid, start, goal, distance)
+    elif engine == Engine.JPS:
+        return jps.jpsSteps(grid, start, goal, distance)
+    elif engine == Engine.BIDIRECTIONAL:
+        return search.bidirectionalSteps(grid, start, goal, distance)
+    elif engine == Engine.HPA:
+        #near-optimal, uses the cluster abstraction cached on the grid
+        return hpa.hpaSteps(grid, start, goal, distance)
+    elif engine == Engine.LPA:
+        #keeps its search between runs and only repairs what wall edits changed
+        return incremental.lpaSteps(grid, start, goal, distance)
+    elif engine == Engine.FLOW:
+        #one distance field from the goal, shared by every start until the walls change
+        return flowfield.flowSteps(grid, start, goal, distance)
+    elif engine == Engine.ARA:
+        #anytime: weighted rounds that end at the optimal path (no time budget here)
+        return anytime.araSteps(grid, start, goal, distance)
+    raise ValueError(f"Unknown search engine: {engine}")
+
+
+#headless entry point: run the chosen engine to the end and hand back its SearchResult.
+#Pass a cache.PathCache to reuse results while the board's walls haven't changed.
+def findPath(grid, start, goal, distance=Algorithm.MANHATTAN, engine=Engine.ASTAR, cache=None):
+    if cache is None:
+        return search.finish(searchSteps(grid, start, goal, distance, engine))
+    key = cache.key(grid, start, goal, distance, engine)
+    result = cache.get(key)
+    if result is None:
+        result = search.finish(searchSteps(grid, start, goal, distance, engine))
+        cache.put(key, result)
+    return result
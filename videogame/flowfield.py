@@ -0,0 +1,103 @@
+# This is the flow field file
+# One breadth first wavefront from the goal over the whole board, done with numpy on
+# arrays of flat indices instead of a cell-at-a-time queue. Every cell ends up with its
+# step count to the goal and the direction of a neighbor one step closer, so when many
+# agents share a destination each one just follows the arrows: O(path length) per agent.
+
+import numpy as np
+from videogame.grid import NORTH, SOUTH, WEST, EAST
+from videogame.search import Algorithm, SearchResult
+
+#distance of cells the goal can't be reached from
+UNREACHABLE = -1
+
+
+def _offsets(cols):
+    #(move bit, flat index step) for the four directions
+    return ((NORTH, -cols), (SOUTH, cols), (WEST, -1), (EAST, 1))
+
+
+def distanceField(grid, goal):
+    """Steps from every cell to goal as an int32 array, UNREACHABLE where there's no way."""
+    return _wavefront(grid, goal)[0]
+
+
+def _wavefront(grid, goal):
+    #returns the distances and the size of the largest wavefront
+    moves = grid.moves
+    offsets = _offsets(grid.cols)
+    distances = np.full(len(grid), UNREACHABLE, dtype=np.int32)
+    distances[goal] = 0
+    frontier = np.array([goal], dtype=np.intp)
+    peak = 1
+    level = 0
+    while frontier.size:
+        level += 1
+        frontierMoves = moves[frontier]
+        #moves are symmetric, so stepping out of the frontier is the same as stepping toward the goal
+        reached = np.concatenate([frontier[(frontierMoves & bit) != 0] + step for bit, step in offsets])
+        reached = np.unique(reached[distances[reached] == UNREACHABLE])
+        distances[reached] = level
+        frontier = reached
+        peak = max(peak, frontier.size)
+    return distances, peak
+
+
+def directionField(grid, distances):
+    """Move bit toward a neighbor one step closer to the goal for every cell, 0 at the goal and where unreachable."""
+    moves = grid.moves
+    directions = np.zeros(len(grid), dtype=np.uint8)
+    for bit, step in _offsets(grid.cols):
+        candidates = np.nonzero(((moves & bit) != 0) & (directions == 0) & (distances > 0))[0]
+        downhill = distances[candidates + step] == distances[candidates] - 1
+        directions[candidates[downhill]] = bit
+    return directions
+
+
+class FlowField:
+    """Distance and direction fields toward one goal, for the wall layout they were built on."""
+    def __init__(self, grid, goal):
+        self.goal = goal
+        self.version = grid.version
+        self.distances, self.peakFrontier = _wavefront(grid, goal)
+        self.directions = directionField(grid, self.distances)
+        self._steps = dict(_offsets(grid.cols))
+
+    def cost(self, start):
+        distance = int(self.distances[start])
+        return float("inf") if distance == UNREACHABLE else distance
+
+    def path(self, start):
+        #follow the arrows, None if start can't get there
+        if self.distances[start] == UNREACHABLE:
+            return None
+        directions = memoryview(self.directions)
+        steps = self._steps
+        path = [start]
+        current = start
+        while current != self.goal:
+            current += steps[directions[current]]
+            path.append(current)
+        return path
+
+
+#the field for the grid's latest goal, rebuilt when the goal or the walls change
+def flowFieldFor(grid, goal):
+    field = grid.derived.get("flow")
+    if field is None or field.goal != goal or field.version != grid.version:
+        field = grid.derived["flow"] = FlowField(grid, goal)
+    return field
+
+
+#drops the grid's cached field so the next query builds it again
+def discardFlowField(grid):
+    grid.derived.pop("flow", None)
+
+
+#Same contract as search.astarSteps. The field is built in one vectorized pass, so there
+#are no single expansions to hand out; the heuristic is not needed and is ignored.
+def flowSteps(grid, start, goal, distance=Algorithm.MANHATTAN):
+    field = flowFieldFor(grid, goal)
+    yield from ()
+    reached = int(np.count_nonzero(field.distances != UNREACHABLE))
+    return SearchResult(field.path(start), field.cost(start), reached, reached, field.peakFrontier)
@@ -3,165 +3,198 @@
 import os
 import warnings
 import pygame
-import math
 import time
+import numpy as np
 import pygame.font
+import pygame.surfarray
 from videogame import rgbcolors
-from queue import PriorityQueue
-from enum import Enum
+from videogame import anytime
+from videogame import engines
+from videogame import flowfield
+from videogame import instrument
+from videogame.cache import PathCache
+from videogame.camera import Camera
+from videogame import grid
+from videogame.grid import CellState
+from videogame.engines import Engine
+from videogame.search import Algorithm
 
 # Following basic format for boilerplate code in CPSC 386
 # TODO: Maybe move these functions into the VideoGame class?
-# Create the board and populate arrays with designated Node objects
+# Create the board as an array backed grid of cell states; Node objects are only
+# made as views when the UI needs one (clicks, beginning/end).
 # Strategy for creating grid/board referenced here:
 # http://programarcadegames.com/index.php?lang=en&chapter=array_backed_grids 
 MARGIN =20
 
-
-class Algorithm(Enum):
-    MANHATTAN = 0
-    EUCLIDEAN = 1
-    CHEBYSHEV = 2
+#what each cell state looks like on screen
+STATE_COLORS = {
+    CellState.EMPTY: rgbcolors.wheat,
+    CellState.WALL: rgbcolors.dark_red,
+    CellState.OPEN: rgbcolors.aquamarine,
+    CellState.CLOSED: rgbcolors.black,
+    CellState.PATH: rgbcolors.green4,
+    CellState.BEGINNING: rgbcolors.azure4,
+    CellState.END: rgbcolors.purple,
+}
+#same colors as a table indexed straight by the state byte
+PALETTE = tuple(STATE_COLORS[state] for state in CellState)
+#and as an array, so a whole block of states becomes colors in one indexing step
+PALETTE_ARRAY = np.array(PALETTE, dtype=np.uint8)
 
 
 def increment_enum(value):
-    members = list(Algorithm)
+    members = list(type(value))
     index = members.index(value)
     next_index = (index + 1) % len(members)  # Wrap around if it reaches the end
     return members[next_index]
 
 
-def create_board(rows, width):
-        board = []
-        #determine the nearest whole number for space between nodes
-        space = math.floor((width-(MARGIN*2))/ rows)
-        #Python equivalent of foreach()
-        for row in range(rows):
-            board.append([])
-            for col in range(rows):
-                node = Node(rows, space, row, col)
-                board[row].append(node)
-        return board
+def create_board(rows, width, cols=None):
+        #every cell starts out empty, one byte each; cols defaults to a square board
+        return grid.Grid(rows, cols)
+
+#grid lines are left out once cells get smaller than this many pixels, they'd hide the cells
+MIN_LINE_CELL_SIZE = 4
+
+#the grid lines only change when the camera moves, so they get drawn onto a transparent
+#surface and blitted from then on.
+_grid_overlay = {"key": None, "surface": None}
+
+def gridOverlay(camera, window_size):
+    key = (camera.key(), window_size)
+    if _grid_overlay["key"] != key:
+        surface = pygame.Surface(window_size, pygame.SRCALPHA)
+        if camera.cellSize >= MIN_LINE_CELL_SIZE:
+            left, top, view_width, view_height = camera.viewport
+            row0, row1, col0, col1 = camera.visible()
+            #lines stop where the board or the viewport ends, whichever comes first
+            right = min(left + view_width - 1, camera.cellRect(camera.rows, 0)[0])
+            bottom = min(top + view_height - 1, camera.cellRect(0, camera.cols)[1])
+            for row in range(row0, row1 + 1):
+                x = camera.cellRect(row, 0)[0]
+                if left <= x <= right:
+                    pygame.draw.line(surface, rgbcolors.blueviolet, (x, top), (x, bottom))
+            for col in range(col0, col1 + 1):
+                y = camera.cellRect(0, col)[1]
+                if top <= y <= bottom:
+                    pygame.draw.line(surface, rgbcolors.blueviolet, (left, y), (right, y))
+        _grid_overlay["key"] = key
+        _grid_overlay["surface"] = surface
+    return _grid_overlay["surface"]
 
 # Use board from previous function to draw to screen using pygame
-def draw_board(rows, width, window):
-    
-    #determine the nearest whole number for space between nodes
-    space = math.floor((width-(MARGIN*2))/ rows)
-    
-    Offset = MARGIN-1
-    for row in range(rows+1):
-        #draw a horizontal line with thickness of space
-        pygame.draw.line(window, rgbcolors.blueviolet, (Offset, Offset+(row * space)), (width-Offset-2, Offset+(row * space)))
-        for col in range(rows+1):
-            #draw a vertical line with thickness of space
-            pygame.draw.line(window, rgbcolors.blueviolet, (Offset+(col * space), Offset), (Offset+(col * space), width-Offset-2))
-
-# Draw each node to screen!
-def draw(window, board, rows, width):
+def draw_board(window, camera):
+    window.blit(gridOverlay(camera, window.get_size()), (0, 0))
+
+#one pixel per cell surfaces, by size, reused from frame to frame
+_cell_surfaces = {}
+
+# Put a (rows, cols, 3) block of cell colors on screen with its top left cell at (row0, col0):
+# the colors go onto a one pixel per cell surface, which is scaled up to the cell size in a
+# single blit. surfarray indexes (x, y), and rows run along x, so the block goes in as is.
+def blitCells(window, camera, colors, row0, col0):
+    shape = colors.shape[:2]
+    if not shape[0] or not shape[1]:
+        return
+    small = _cell_surfaces.get(shape)
+    if small is None:
+        small = _cell_surfaces[shape] = pygame.Surface(shape)
+    pygame.surfarray.blit_array(small, colors)
+    size = camera.cellSize
+    if size != 1:
+        small = pygame.transform.scale(small, (shape[0] * size, shape[1] * size))
+    x, y, _, _ = camera.cellRect(row0, col0)
+    #cells at the edges are clipped to the viewport instead of spilling into the margin
+    window.set_clip(camera.viewport)
+    window.blit(small, (x, y))
+    window.set_clip(None)
+
+# Draw each visible node to screen! The caller pushes the frame out with pygame.display.update().
+def draw(window, board, camera):
     window.fill(rgbcolors.black)
-    for row in board:
-        for node in row:
-            node.draw(window)
-    draw_board(rows, width, window)
-    pygame.display.update()
-
-#simple mouse position retrieval courtesy of pygame docs.
-def getMouse(mousePos, rows, width):
-    yPos, xPos = mousePos
-    space = math.floor((width-(MARGIN*2)) / rows)
-    print(space)
-    if MARGIN is 0:
-        return math.floor(yPos / space), math.floor(xPos / space)
-    else: 
-        return math.floor(yPos / space)-1, math.floor(xPos / space)-1
+    row0, row1, col0, col1 = camera.visible()
+    blitCells(window, camera, PALETTE_ARRAY[board.view()[row0:row1, col0:col1]], row0, col0)
+    draw_board(window, camera)
+    board.takeChanged()
+
+# Redraw only the visible cells that changed since the last draw and return their rects for
+# pygame.display.update(). Falls back to a full draw and returns None when the board
+# can't say what changed (fresh board, reset).
+def drawChanged(window, board, camera):
+    changed = board.takeChanged()
+    if changed is None:
+        draw(window, board, camera)
+        return None
+    row0, row1, col0, col1 = camera.visible()
+    viewport = pygame.Rect(camera.viewport)
+    size = camera.cellSize
+    cols = board.cols
+    cells = board.cells
+    overlay = gridOverlay(camera, window.get_size())
+    rects = []
+    window.set_clip(viewport)
+    for index in changed:
+        row, col = divmod(index, cols)
+        if not (row0 <= row < row1 and col0 <= col < col1):
+            continue
+        x, y, w, h = camera.cellRect(row, col)
+        pygame.draw.rect(window, PALETTE[cells[index]], (x, y, w, h))
+        #the rect covers this cell's grid lines, put that patch of the overlay back
+        rect = pygame.Rect(x, y, size+1, size+1).clip(viewport)
+        window.blit(overlay, rect, rect)
+        rects.append(rect)
+    window.set_clip(None)
+    return rects
+
+# Draw the goal's distance field instead of the cell states: near cells warm, far cells cool.
+# Walls, the beginning and the end keep their usual colors, cells that can't reach the goal are gray.
+def drawHeatmap(window, board, camera, goal):
+    window.fill(rgbcolors.black)
+    row0, row1, col0, col1 = camera.visible()
+    distances = flowfield.flowFieldFor(board, goal).distances
+    farthest = max(1, int(distances.max()))
+    near, far = np.array(rgbcolors.yellow, dtype=np.float32), np.array(rgbcolors.navy, dtype=np.float32)
+    states = board.view()[row0:row1, col0:col1]
+    visible_distances = distances.reshape(board.rows, board.cols)[row0:row1, col0:col1]
+    blend = (visible_distances / farthest).astype(np.float32)[..., None]
+    colors = np.rint(near + (far - near) * blend).astype(np.uint8)
+    colors[visible_distances == flowfield.UNREACHABLE] = rgbcolors.gray50
+    keep = (states == CellState.WALL) | (states == CellState.BEGINNING) | (states == CellState.END)
+    colors[keep] = PALETTE_ARRAY[states[keep]]
+    blitCells(window, camera, colors, row0, col0)
+    draw_board(window, camera)
+    board.takeChanged()
+
+#mouse position to board cell through the camera, None when the click misses the board
+def getMouse(mousePos, camera):
+    return camera.cellAt(*mousePos)
     
-#Heuristic functions
-def manhattanDistance(p1, p2):
-    x1, y1 = p1
-    x2, y2 = p2
-    return abs(x1 - x2) + abs(y1 - y2)
-
-def euclideanDistance(p1, p2):
-    x1, y1 = p1
-    x2, y2 = p2
-    return math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
-
-def chebyshevDistance(p1, p2):
-    x1, y1 = p1
-    x2, y2 = p2
-    return max(abs(x1 - x2), abs(y1 - y2))
-
-
-def colorFinalPath(previous, currNode, draw):
-    ##go backwards through previous list and color it to make final path.
-    while currNode in previous:
-        currNode = previous[currNode]
-        currNode.definePath()
-        draw()
-
-#A star algorithm modified from example from lecture and wikipedia implementation in python
-def astarRun(draw, board, beginning, end, distance=Algorithm.MANHATTAN):
-    count = 0
-    #setup frontier priorityqueue to keep open nodes
-    frontier = PriorityQueue()
-    frontier.put((0, count, beginning))
-    #initialize the pathcost for each path to infinity so that it is overwritten with heuristic cost later.
-    pathCost = {node: float("inf") for row in board for node in row}
-    pathCost[beginning] = 0
-    heuristic = {node: float("inf") for row in board for node in row}
-    heuristic[beginning] = manhattanDistance(beginning.getPos(), end.getPos())
-    previous = {}
-    #keep track of items in priority queue
-    frontier_hash = {beginning}
-    distanceFunction = None
-    #switch between heuristic types
-    if distance==Algorithm.MANHATTAN:
-        distanceFunction = manhattanDistance 
-    elif distance==Algorithm.EUCLIDEAN:
-        distanceFunction = euclideanDistance
-    elif distance== Algorithm.CHEBYSHEV:
-        distanceFunction = chebyshevDistance
-    #redo the beginning heuristic in case the option changed
-    heuristic[beginning] = distanceFunction(beginning.getPos(), end.getPos())
-    #while there are still nodes in frontier, keep running
-    while not frontier.empty():
-        #2 gets the node since its the 3rd item in that set, preceded by heuristic and count            
-        currNode = frontier.get()[2]
-        #its no longer in the frontier so it needs to be removed.
-        frontier_hash.remove(currNode)
-        #we're done and can now draw the final path
-        if currNode == end:
-            colorFinalPath(previous, end, draw)
-            end.defineEnd()
-            return True
-        #go through all adjacent nodes and determine if its a better path in terms of cost
-        for adjacent in currNode.adjacents:
-            #since we are moving only one node ahead, we can add 1 to pathcost.
-            temp_pathCost = pathCost[currNode] + 1
-            #if this currNode pathcost is smaller than the adjacents, make this the path we choose
-            if temp_pathCost < pathCost[adjacent]:
-                previous[adjacent] = currNode
-                pathCost[adjacent] = temp_pathCost
-                heuristic[adjacent] = temp_pathCost + distanceFunction(adjacent.getPos(), end.getPos())		
-                #if adjacent node is not in frontier, add it with order.		
-                if adjacent not in frontier_hash:
-                    count += 1
-                    #add 1 to count and then add count to it
-                    #this prioritizes exploring nodes that were added earlier in the run
-                    #it gives it a smaller heuristic score because it was added when count was lower.
-                    frontier.put((heuristic[adjacent], count, adjacent))
-                    frontier_hash.add(adjacent)
-                    adjacent.open()
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        pygame.quit()
-        draw()
-        #make sure not to recolor the beginning node.
-        if currNode != beginning:
-            currNode.close()
-
-    return False
+#A star visualization, the search itself lives in videogame.search and these just
+#color the board from the steps it yields.
+def showStep(board, beginning, end, step):
+    index, opened = step
+    #make sure not to recolor the beginning or end node, searches can start from either.
+    ends = (beginning.index, end.index)
+    for adjacent in opened:
+        if adjacent not in ends:
+            board.setState(adjacent, CellState.OPEN)
+    if index not in ends:
+        board.setState(index, CellState.CLOSED)
+
+def showPath(board, end, path):
+    ##color everything between the beginning and the end to make the final path,
+    ##the two ends keep their own state so reset() and saveMap still find them.
+    for index in path[1:-1]:
+        board.setState(index, CellState.PATH)
+    end.defineEnd()
+
+def storedNode(board, state):
+    #a loaded map remembers its beginning and end (see mapio.loadMap), pick them back up as nodes
+    index = board.derived.get("ends", {}).get(state)
+    if index is None or board.cells[index] != state:
+        return None
+    return Node(board, *board.position(index))
 
 
 
@@ -175,16 +208,44 @@ class VideoGame:
     ):
         """Initialize a new game with the given window size and window title."""
         # Borrowed from previous class project.
-        pygame.init()
+        #only the modules we use; pygame.init() would also open the audio device
+        pygame.display.init()
         pygame.font.init()
         self.duration_text = None
-        self.font = pygame.font.SysFont('Arial', 20)
+        #pygame's bundled font, SysFont would go scanning the system font directories
+        self.font = pygame.font.Font(None, 20)
         #used to switch between heurstics 
        # self.distance_method = "manhattan"
         self.distance_method = Algorithm.MANHATTAN
+        #which search runs with that heuristic
+        self.engine = Engine.ASTAR
+        #H swaps the board for a heatmap of every cell's distance to the end
+        self.show_heatmap = False
+        #search animation speed: expansions consumed per frame, None runs straight to the result
+        self.steps_per_frame = 4
+        self.fps = 60
+        self._search = None
+        self._search_key = None
+        self._search_time = 0
+        #the ARA* run behind self._search when that engine is picked, for its live bound
+        self._anytime = None
+        #seconds of search time ARA* gets before it settles for its best path so far
+        self.anytime_budget = 2.0
+        #statistics of the latest run, shown with I and appended to stats_log (a path) when set
+        self._run_stats = None
+        self.show_stats = False
+        self.stats_log = None
+        #finished searches, reused while the walls and the query stay the same
+        self.path_cache = PathCache()
+        #rendered HUD text per slot as (text, surface), and where each slot was last drawn
+        self._hud_text = {}
+        self._hud_rects = {}
         self._window_size = (window_width, window_height)
         self._clock = pygame.time.Clock()
-        self._screen = pygame.display.set_mode(self._window_size)
+        #reuse a window the caller already opened rather than setting the mode twice
+        self._screen = pygame.display.get_surface()
+        if self._screen is None or self._screen.get_size() != self._window_size:
+            self._screen = pygame.display.set_mode(self._window_size)
         self._title = window_title
         pygame.display.set_caption(self._title)
         self._game_is_over = False
@@ -193,29 +254,68 @@ class VideoGame:
         if not pygame.mixer:
             warnings.warn("Sound disabled.", RuntimeWarning)
     
-    def run(self, window, width):
-        """Run the game; the main game loop."""
+    def run(self, window, width, board=None, rows=40, cols=None):
+        """Run the game; the main game loop. board is a loaded Grid, or None for a fresh rows x cols one."""
         
-        row_num = 40
-        board = create_board(row_num, width)
-        beginning = None
-        end = None
+        if board is None:
+            board = create_board(rows, width, cols)
+        #arrows pan, the mouse wheel zooms, 0 fits the board back in the window
+        window_width, window_height = window.get_size()
+        camera = Camera(board.rows, board.cols, MARGIN, MARGIN, window_width - MARGIN*2, window_height - MARGIN*2)
+        beginning = storedNode(board, CellState.BEGINNING)
+        end = storedNode(board, CellState.END)
+        #full repaint pending: first frame, key presses (HUD and modes change) and window exposes
+        redraw = True
         while True:
-            draw(window, board, row_num, width)
+            if self._search:
+                self.advanceSearch(board, beginning, end)
+            #otherwise only what changed gets drawn, and nothing at all if nothing did
+            render_start = time.perf_counter()
+            heatmap = self.show_heatmap and end and not self._search
+            rects = None
+            if not redraw and not (heatmap and board.changed != set()):
+                rects = drawChanged(window, board, camera)
+            elif heatmap:
+                drawHeatmap(window, board, camera, end.index)
+            else:
+                draw(window, board, camera)
+            if rects is None:
+                #the whole window was repainted, HUD included
+                self._hud_rects.clear()
+                self.drawHud(window, width)
+                pygame.display.update()
+            elif rects or self._search:
+                rects.extend(self.drawHud(window, width))
+                pygame.display.update(rects)
+            redraw = False
+            self._countTime("render_seconds", render_start)
             
             #Input
-            for event in pygame.event.get():
+            event_start = time.perf_counter()
+            if self._search:
+                events = pygame.event.get()
+            else:
+                #idle: sleep until something happens instead of spinning
+                events = [pygame.event.wait()] + pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
+                    #nothing below may touch pygame once it has been shut down
                     pygame.quit()
+                    return
+                if event.type in (pygame.KEYDOWN, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    redraw = True
+                if event.type == pygame.MOUSEWHEEL and event.y:
+                    camera.zoom(1.25 if event.y > 0 else 0.8, pygame.mouse.get_pos())
+                    redraw = True
                 #Left mouse click
-                if pygame.mouse.get_pressed()[0]:
-                    pos = pygame.mouse.get_pos()
-                    row, col = getMouse(pos, row_num, width)
+                cell = None
+                if pygame.mouse.get_pressed()[0] and not self._search:
+                    cell = getMouse(pygame.mouse.get_pos(), camera)
+                if cell is not None:
+                    row, col = cell
                     #debugging info about node position when clicked
-                    if(row==-1 or col==-1 or row>len(board)-1 or col>len(board[0])-1):
-                        break
                     print(row, col)
-                    node = board[row][col]
+                    node = Node(board, row, col)
                     #if beginning is undefined, set the current clicked node as beginning
                     if not beginning:
                         beginning = node
@@ -227,108 +327,203 @@ class VideoGame:
                     #now that both prev are defined, make all proceeding clicks into walls.
                     elif node != end and node != beginning:
                         node.defineWall()
-                        node.defineTag("wall")
                 
                 if event.type == pygame.KEYDOWN:
                     #Pressing the D Key switches between manhattan and euclidean 
                     if event.key == pygame.K_d:
                         self.distance_method=increment_enum(self.distance_method)
+                    #E cycles the search engine (plain A*, jump point search, bidirectional A*, HPA*, LPA*, flow field, ARA*)
+                    if event.key == pygame.K_e:
+                        self.engine = increment_enum(self.engine)
+                    #+/- speed the animation up or down, F skips straight to the result
+                    if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS) and self.steps_per_frame:
+                        self.steps_per_frame *= 2
+                    if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS) and self.steps_per_frame:
+                        self.steps_per_frame = max(1, self.steps_per_frame // 2)
+                    if event.key == pygame.K_f:
+                        self.steps_per_frame = None if self.steps_per_frame else 4
+                    if event.key == pygame.K_h:
+                        self.show_heatmap = not self.show_heatmap
+                    if event.key == pygame.K_i:
+                        self.show_stats = not self.show_stats
+                    #pan a quarter of the view at a time
+                    if event.key == pygame.K_LEFT:
+                        camera.pan(-camera.width // 4, 0)
+                    if event.key == pygame.K_RIGHT:
+                        camera.pan(camera.width // 4, 0)
+                    if event.key == pygame.K_UP:
+                        camera.pan(0, -camera.height // 4)
+                    if event.key == pygame.K_DOWN:
+                        camera.pan(0, camera.height // 4)
+                    if event.key == pygame.K_0:
+                        camera.fit()
                   
                     #only run if the beginning and end are defined.
                     if event.key == pygame.K_SPACE and beginning and end:
-                        start_time = time.time()
-                        for row in board:
-                            for node in row:
-                                node.defineAdjacents(board)
-                                if node != beginning and node !=end and node.tag!="wall":
-                                     node.color = rgbcolors.wheat
-                        pathFound=astarRun(lambda: draw(window, board, row_num, width), board, beginning, end, distance=self.distance_method)
-                        ##timer to keep track of the time it takes for path to be found.
-                        duration = time.time() - start_time
-                        if pathFound:
-                            self.duration_text = f"Pathfinding Algorithm took {duration:.2f} seconds"
+                        board.reset()
+                        self._run_stats = instrument.RunStats(self.engine, self.distance_method, board)
+                        self._search_key = self.path_cache.key(board, beginning.index, end.index, self.distance_method, self.engine)
+                        cached = self.path_cache.get(self._search_key)
+                        if cached:
+                            self.finishStats(cached, cached=True)
+                            self.showResult(board, end, cached, None)
                         else:
-                            self.duration_text = "No valid path found!"
+                            self._anytime = None
+                            if self.engine == Engine.ARA:
+                                #built here rather than through engines so the HUD can follow its bound
+                                self._anytime = anytime.AnytimeSearch(board, beginning.index, end.index, self.distance_method,
+                                                                      budget=self.anytime_budget)
+                                self._search = self._anytime.steps()
+                            else:
+                                self._search = engines.searchSteps(board, beginning.index, end.index, self.distance_method, self.engine)
+                            self._search_time = 0
+                            self.duration_text = None
 
                 #draw(window, board, row_num, width) 
-                        
-                
-            #draws the timer onto screen    
-            if self.duration_text:
-                text_surface = self.font.render(self.duration_text, True, rgbcolors.red)
-                window.blit(text_surface, (0,0))    
-            ##draws the selected distance method to screen.
-            if self.distance_method:
-                algorithm_text = f"Current Algorithm: {self.distance_method.name}"
-                text_surface = self.font.render(algorithm_text, True, rgbcolors.red)
-                window.blit(text_surface, (width-300,0))    
-                
-            pygame.display.update()    
+            self._countTime("event_seconds", event_start)
+            #cap the animation's frame rate, idle frames already waited on events
+            if self._search:
+                self._clock.tick(self.fps)
+
+    def hudText(self, slot, text):
+        #font.render is slow, so each HUD slot keeps its surface until its string changes
+        cached = self._hud_text.get(slot)
+        if cached is None or cached[0] != text:
+            cached = self._hud_text[slot] = (text, self.font.render(text, True, rgbcolors.red, rgbcolors.black))
+        return cached[1]
+
+    def drawHud(self, window, width):
+        """Blit the HUD text and return the screen rects it touched."""
+        lines = []
+        #draws the timer onto screen
+        if self.duration_text:
+            lines.append(("duration", self.duration_text, False, 0))
+        ##draws the selected distance method to screen.
+        if self.distance_method:
+            lines.append(("algorithm", f"Current Algorithm: {self.engine.name} {self.distance_method.name}", True, 0))
+        #I toggles the latest run's counters under the timer
+        if self.show_stats and self._run_stats:
+            line_height = self.font.get_linesize()
+            for line_num, line in enumerate(self._run_stats.lines(), 1):
+                lines.append((f"stats{line_num}", line, False, line_num * line_height))
+        rects = []
+        for slot, text, right, y in lines:
+            text_surface = self.hudText(slot, text)
+            x = width - text_surface.get_width() if right else 0
+            rect = pygame.Rect((x, y), text_surface.get_size())
+            old = self._hud_rects.get(slot)
+            if old is not None and not rect.contains(old):
+                #a shorter string than last time, blank out what the old one covered
+                window.fill(rgbcolors.black, old)
+                rect = rect.union(old)
+            window.blit(text_surface, (x, y))
+            self._hud_rects[slot] = pygame.Rect((x, y), text_surface.get_size())
+            rects.append(rect)
+        return rects
 
-#Node class, represented by a square on the screen
+    def advanceSearch(self, board, beginning, end):
+        """Run this frame's share of the search and color the board with it."""
+        budget = self.steps_per_frame
+        steps = self._search
+        ##timer only counts time spent searching, not drawing.
+        start_time = time.perf_counter()
+        stats = self._run_stats
+        try:
+            while budget is None or budget > 0:
+                showStep(board, beginning, end, next(steps))
+                stats.steps += 1
+                if budget is not None:
+                    budget -= 1
+        except StopIteration as done:
+            self._search = None
+            stats.search_seconds = self._search_time + time.perf_counter() - start_time
+            stats.frames += 1
+            self.finishStats(done.value)
+            #a run the time budget cut short isn't the answer to cache
+            if self._anytime is None or self._anytime.bound <= 1:
+                self.path_cache.put(self._search_key, done.value)
+            self.showResult(board, end, done.value, self._search_time + time.perf_counter() - start_time)
+        else:
+            if self._anytime is not None and self._anytime.path is not None:
+                self.duration_text = self.anytimeText()
+            stats.frames += 1
+        self._search_time += time.perf_counter() - start_time
+        stats.search_seconds = self._search_time
+
+    def _countTime(self, field, since):
+        #charge the time since `since` to the running search's stats, if one is running
+        stats = self._run_stats
+        if stats is not None and not stats.done:
+            setattr(stats, field, getattr(stats, field) + time.perf_counter() - since)
+
+    def finishStats(self, result, cached=False):
+        self._run_stats.finish(result, cached)
+        if self.stats_log:
+            instrument.appendLog(self.stats_log, self._run_stats)
+
+    def anytimeText(self):
+        search = self._anytime
+        return f"ARA* weight {search.weight:.1f}: cost {search.cost}, at most {search.bound:.2f}x optimal"
+
+    def showResult(self, board, end, result, duration):
+        """Color the final path and set the HUD text; duration is None for cache hits."""
+        if not result.found:
+            self.duration_text = "No valid path found!"
+            return
+        showPath(board, end, result.path)
+        if duration is None:
+            stats = self.path_cache.stats()
+            self.duration_text = f"Cached path ({stats['hits']} hits / {stats['misses']} misses)"
+        else:
+            self.duration_text = f"Pathfinding Algorithm took {duration:.2f} seconds ({result.expanded} expanded)"
+            if self._anytime is not None:
+                self.duration_text += f", cost {result.cost} at most {self._anytime.bound:.2f}x optimal"
+
+#Node class, a view of one square of the board grid.
+#It holds no state of its own, everything is read from and written to the grid array.
 class Node:
-    def __init__(self,total,width,row,column):
-        
-        self.x_pos = width * row
-        self.y_pos = width * column
-        
-        if MARGIN is not 0:            
-            self.x_pos = width * (row+1)
-            self.y_pos = width * (column+1)
-        #Boilerplate attributes to keep track of location, color, and adjacents.
-        self.width = width
-        self.color = rgbcolors.wheat
-        self.row_total = total
+    __slots__ = ("board", "row", "col", "index")
+
+    def __init__(self, board, row, column):
+        self.board = board
         self.row = row
         self.col = column
-        self.adjacents = []
-        self.tag="empty"
+        self.index = board.index(row, column)
 
-    
-    def draw(self, window):
-        pygame.draw.rect(window, self.color, (self.x_pos, self.y_pos, self.width, self.width))
-            
-    
-    def defineTag(self, tag_type):
-        self.tag = tag_type
-    #changes color of node depending on what kind of node it is.   
+    def __eq__(self, other):
+        return isinstance(other, Node) and self.board is other.board and self.index == other.index
+
+    def __hash__(self):
+        return hash(self.index)
+
+    @property
+    def state(self):
+        return self.board.state(self.index)
+
+    @property
+    def color(self):
+        #colors are only looked up for drawing, the state byte is what the logic checks
+        return PALETTE[self.board.cells[self.index]]
+
+    #changes the state of the node depending on what kind of node it is.
     def defineBeginning(self):
-        self.color = rgbcolors.azure4
+        self.board.setState(self.index, CellState.BEGINNING)
     def defineEnd(self):
-        self.color = rgbcolors.purple
+        self.board.setState(self.index, CellState.END)
     def defineWall(self):
-        self.color = rgbcolors.dark_red
+        self.board.setState(self.index, CellState.WALL)
     def isWall(self):
-        return self.color == rgbcolors.dark_red
+        return self.board.cells[self.index] == CellState.WALL
     def definePath(self):
-         self.color = rgbcolors.green4
-    
-    
-        #fills out the adjacents for each node
-        #adapted from grid traversal article on geeksforgeeks.
-    def defineAdjacents(self, board):
-        self.adjacents = []
-        #checks adjacent to the north
-        if self.row > 0 and not board[self.row - 1][self.col].isWall():
-            self.adjacents.append(board[self.row - 1][self.col])
-        #south
-        if self.row < self.row_total - 1 and not board[self.row + 1][self.col].isWall():
-            self.adjacents.append(board[self.row + 1][self.col])
-        #left
-        if self.col > 0 and not board[self.row][self.col - 1].isWall():
-            self.adjacents.append(board[self.row][self.col - 1])
-        #right
-        if self.col < self.row_total - 1 and not board[self.row][self.col + 1].isWall():
-            self.adjacents.append(board[self.row][self.col + 1])
+        self.board.setState(self.index, CellState.PATH)
     #simple fuctions that return position. open/close nodes as well as return bools.
     def getPos(self):
          return self.row, self.col
     def open(self):
-         self.color = rgbcolors.aquamarine
+         self.board.setState(self.index, CellState.OPEN)
     def isOpen(self):
-         return self.color == rgbcolors.aquamarine
+         return self.board.cells[self.index] == CellState.OPEN
     def close(self):
-         self.color = rgbcolors.black
+         self.board.setState(self.index, CellState.CLOSED)
     def isClosed(self):
-        return self.color == rgbcolors.black
-
+        return self.board.cells[self.index] == CellState.CLOSED
@@ -0,0 +1,135 @@
+# This is the grid model file
+# The board is one contiguous numpy array of small integer cell states, addressed
+# by flat index (row * cols + col). No pygame in here; the UI builds Node views on demand.
+
+from enum import IntEnum
+from itertools import count
+import numpy as np
+
+
+class CellState(IntEnum):
+    """What a cell is, stored as one byte per cell. Colors are a render-time lookup."""
+    EMPTY = 0
+    WALL = 1
+    OPEN = 2
+    CLOSED = 3
+    PATH = 4
+    BEGINNING = 5
+    END = 6
+
+
+#wall layout versions come from one counter for every board in the process, so two boards
+#never share a version and anything keyed on it can't mix them up
+_versions = count(1)
+
+#bits of the per-cell move mask, set when the neighbor that way is on the board and not a wall
+NORTH = 1
+SOUTH = 2
+WEST = 4
+EAST = 8
+
+
+class Grid:
+    """Compact rows x cols board of cell states."""
+    def __init__(self, rows, cols=None, cells=None, moves=None):
+        #cells/moves may be passed in to wrap existing buffers (shared memory, a mapped file);
+        #moves that come with them are trusted as they are instead of being rebuilt.
+        if cols is None:
+            cols = rows
+        self.rows = rows
+        self.cols = cols
+        self.cells = np.zeros(rows * cols, dtype=np.uint8) if cells is None else cells
+        #open directions out of each cell (zero for walls), kept up to date as walls
+        #come and go so a search never has to rebuild adjacency.
+        self.moves = np.zeros(rows * cols, dtype=np.uint8) if moves is None else moves
+        #called as listener(index) whenever a cell turns into or stops being a wall,
+        #listener(None) after a bulk rebuild. Lets derived structures update locally.
+        self.wallListeners = []
+        #structures built from this board (search hierarchies and the like), keyed by name
+        self.derived = {}
+        #renewed whenever the wall layout changes, so anything computed from walls can tell it's stale
+        self.version = next(_versions)
+        if moves is None:
+            self.rebuildMoves()
+        #cells touched since the renderer last looked, None means "assume everything"
+        self.changed = None
+
+    def __len__(self):
+        return self.rows * self.cols
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def position(self, index):
+        return divmod(index, self.cols)
+
+    def inBounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def state(self, index):
+        return CellState(self.cells[index])
+
+    def setState(self, index, state):
+        wasWall = self.cells[index] == CellState.WALL
+        self.cells[index] = state
+        if wasWall != (state == CellState.WALL):
+            self._updateMoves(index, not wasWall)
+            self.version = next(_versions)
+            for listener in self.wallListeners:
+                listener(index)
+        if self.changed is not None:
+            self.changed.add(index)
+
+    def _updateMoves(self, index, isWall):
+        #only this cell's mask and the four neighbors' bits pointing at it change
+        moves = self.moves
+        cells = self.cells
+        row, col = divmod(index, self.cols)
+        own = 0
+        for inBounds, neighbor, bit, back in ((row > 0, index - self.cols, NORTH, SOUTH),
+                                              (row < self.rows - 1, index + self.cols, SOUTH, NORTH),
+                                              (col > 0, index - 1, WEST, EAST),
+                                              (col < self.cols - 1, index + 1, EAST, WEST)):
+            if inBounds and cells[neighbor] != CellState.WALL:
+                own |= bit
+                if isWall:
+                    moves[neighbor] &= ~back & 0xFF
+                else:
+                    moves[neighbor] |= back
+        #a wall has no way out
+        moves[index] = 0 if isWall else own
+
+    def rebuildMoves(self):
+        #recompute every move mask, needed after writing self.cells directly in bulk
+        #everything stays uint8 (bool * python int keeps the array's dtype), so the peak is a
+        #few bytes per cell instead of int64 temporaries
+        passable = (self.view() != CellState.WALL).view(np.uint8)
+        moves = self.moves.reshape(self.rows, self.cols)
+        moves[:] = 0
+        moves[1:, :] |= passable[:-1, :] * np.uint8(NORTH)
+        moves[:-1, :] |= passable[1:, :] * np.uint8(SOUTH)
+        moves[:, 1:] |= passable[:, :-1] * np.uint8(WEST)
+        moves[:, :-1] |= passable[:, 1:] * np.uint8(EAST)
+        moves *= passable
+        self.version = next(_versions)
+        for listener in self.wallListeners:
+            listener(None)
+
+    def takeChanged(self):
+        #hands back the changed cell indices (or None for all) and starts tracking afresh
+        changed = self.changed
+        self.changed = set()
+        return changed
+
+    def isWall(self, index):
+        return self.cells[index] == CellState.WALL
+
+    def view(self):
+        #2d (rows, cols) view over the same memory, handy for vectorized work
+        return self.cells.reshape(self.rows, self.cols)
+
+    def reset(self):
+        #wipe the search coloring but keep walls, beginning and end.
+        cells = self.cells
+        cells[(cells == CellState.OPEN) | (cells == CellState.CLOSED) | (cells == CellState.PATH)] = CellState.EMPTY
+        self.changed = None
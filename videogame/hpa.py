@@ -0,0 +1,267 @@
+# This is the hierarchical pathfinding file
+# HPA*: the board is cut into square clusters. Wherever two neighboring clusters share an
+# opening, entrance cells are placed on both sides. Queries search the small graph of
+# entrances (distances inside a cluster are worked out once and cached), then the abstract
+# path is refined into cells with short searches that never leave one cluster.
+# Paths are near-optimal rather than optimal, that's the usual HPA* trade.
+
+from collections import deque
+from videogame.grid import NORTH, SOUTH, WEST, EAST
+from videogame.openlist import OpenList
+from videogame.search import Algorithm, SearchResult, distanceFunctionFor, finish, reconstructPath
+
+DEFAULT_CLUSTER_SIZE = 16
+#openings at least this long get an entrance at each end instead of one in the middle
+LONG_ENTRANCE = 6
+
+
+class HierarchicalMap:
+    """Cluster abstraction of a Grid, kept current as walls change."""
+    def __init__(self, grid, clusterSize=DEFAULT_CLUSTER_SIZE):
+        self.grid = grid
+        self.clusterSize = clusterSize
+        self.clusterRows = -(-grid.rows // clusterSize)
+        self.clusterCols = -(-grid.cols // clusterSize)
+        #cell -> cells in the neighboring cluster it steps straight into
+        self._partners = {}
+        #cluster -> {entrance cell: how many border pairs use it}
+        self._entrances = {}
+        #(cluster, cluster to its right/below) -> [(cell, cell)] entrance pairs on that border
+        self._borders = {}
+        #cluster -> {entrance: {other entrance: distance}}, filled in lazily and kept until a wall changes
+        self._intra = {}
+        #cells whose wall state changed since the last query
+        self._dirty = set()
+        #how many times cluster distance tables have been computed, handy for checking locality
+        self.clusterBuilds = 0
+        self._buildAllBorders()
+        grid.wallListeners.append(self.updateCell)
+
+    def clusterOf(self, index):
+        row, col = divmod(index, self.grid.cols)
+        return row // self.clusterSize, col // self.clusterSize
+
+    def _bounds(self, cluster):
+        size = self.clusterSize
+        row0, col0 = cluster[0] * size, cluster[1] * size
+        return row0, min(row0 + size, self.grid.rows), col0, min(col0 + size, self.grid.cols)
+
+    #Entrances
+    def _buildAllBorders(self):
+        self._partners.clear()
+        self._entrances.clear()
+        self._borders.clear()
+        self._intra.clear()
+        for clusterRow in range(self.clusterRows):
+            for clusterCol in range(self.clusterCols):
+                cluster = (clusterRow, clusterCol)
+                if clusterCol + 1 < self.clusterCols:
+                    self._buildBorder(cluster, (clusterRow, clusterCol + 1))
+                if clusterRow + 1 < self.clusterRows:
+                    self._buildBorder(cluster, (clusterRow + 1, clusterCol))
+
+    def _buildBorder(self, first, second):
+        #second is the cluster right of or below first
+        for cell, other in self._borders.pop((first, second), ()):
+            self._unlink(first, cell, other)
+            self._unlink(second, other, cell)
+        moves = memoryview(self.grid.moves)
+        cols = self.grid.cols
+        row0, row1, col0, col1 = self._bounds(first)
+        if second[1] > first[1]:
+            #vertical border: walk down the last column of first, stepping east across it
+            cells = [row * cols + col1 - 1 for row in range(row0, row1)]
+            step, bit = 1, EAST
+        else:
+            cells = [(row1 - 1) * cols + col for col in range(col0, col1)]
+            step, bit = cols, SOUTH
+        pairs = []
+        run = []
+        for cell in cells + [None]:
+            if cell is not None and moves[cell] & bit:
+                run.append(cell)
+                continue
+            if run:
+                picks = (run[0], run[-1]) if len(run) >= LONG_ENTRANCE else (run[len(run) // 2],)
+                pairs.extend((pick, pick + step) for pick in picks)
+                run = []
+        for cell, other in pairs:
+            self._link(first, cell, other)
+            self._link(second, other, cell)
+        self._borders[(first, second)] = pairs
+
+    def _link(self, cluster, cell, other):
+        entrances = self._entrances.setdefault(cluster, {})
+        entrances[cell] = entrances.get(cell, 0) + 1
+        self._partners.setdefault(cell, set()).add(other)
+        self._intra.pop(cluster, None)
+
+    def _unlink(self, cluster, cell, other):
+        entrances = self._entrances[cluster]
+        entrances[cell] -= 1
+        if not entrances[cell]:
+            del entrances[cell]
+        self._partners[cell].discard(other)
+        if not self._partners[cell]:
+            del self._partners[cell]
+        self._intra.pop(cluster, None)
+
+    #Wall changes
+    def updateCell(self, index):
+        #grid wall listener; the work waits until the next query
+        if index is None:
+            self._dirty = None
+        elif self._dirty is not None:
+            self._dirty.add(index)
+
+    def _refresh(self):
+        dirty = self._dirty
+        self._dirty = set()
+        if dirty is None:
+            self._buildAllBorders()
+            return
+        for index in dirty:
+            cluster = self.clusterOf(index)
+            #the cluster's own distances are stale either way
+            self._intra.pop(cluster, None)
+            row, col = divmod(index, self.grid.cols)
+            row0, row1, col0, col1 = self._bounds(cluster)
+            clusterRow, clusterCol = cluster
+            #only cells on the cluster's edge can change entrances, and with them the neighbor's table
+            if row == row0 and clusterRow > 0:
+                self._buildBorder((clusterRow - 1, clusterCol), cluster)
+            if row == row1 - 1 and clusterRow + 1 < self.clusterRows:
+                self._buildBorder(cluster, (clusterRow + 1, clusterCol))
+            if col == col0 and clusterCol > 0:
+                self._buildBorder((clusterRow, clusterCol - 1), cluster)
+            if col == col1 - 1 and clusterCol + 1 < self.clusterCols:
+                self._buildBorder(cluster, (clusterRow, clusterCol + 1))
+
+    #Searches confined to one cluster
+    def _localSearch(self, source, cluster, target=None):
+        #breadth first search that never leaves the cluster, returns (distances, previous)
+        moves = memoryview(self.grid.moves)
+        cols = self.grid.cols
+        row0, row1, col0, col1 = self._bounds(cluster)
+        distances = {source: 0}
+        previous = {}
+        queue = deque([source])
+        while queue:
+            cell = queue.popleft()
+            if cell == target:
+                break
+            move = moves[cell]
+            row, col = divmod(cell, cols)
+            for adjacent, allowed in ((cell - cols, move & NORTH and row > row0),
+                                      (cell + cols, move & SOUTH and row < row1 - 1),
+                                      (cell - 1, move & WEST and col > col0),
+                                      (cell + 1, move & EAST and col < col1 - 1)):
+                if allowed and adjacent not in distances:
+                    distances[adjacent] = distances[cell] + 1
+                    previous[adjacent] = cell
+                    queue.append(adjacent)
+        return distances, previous
+
+    def _intraFor(self, cluster):
+        table = self._intra.get(cluster)
+        if table is None:
+            entrances = self._entrances.get(cluster, {})
+            table = {}
+            for entrance in entrances:
+                distances = self._localSearch(entrance, cluster)[0]
+                table[entrance] = {other: distances[other] for other in entrances
+                                   if other != entrance and other in distances}
+            self._intra[cluster] = table
+            self.clusterBuilds += 1
+        return table
+
+    def preprocess(self):
+        #compute every cluster's distance table now instead of on first use
+        self._refresh()
+        for clusterRow in range(self.clusterRows):
+            for clusterCol in range(self.clusterCols):
+                self._intraFor((clusterRow, clusterCol))
+
+    #Queries
+    def querySteps(self, start, goal, distance=Algorithm.MANHATTAN):
+        """Step generator over the abstract graph, same contract as search.astarSteps."""
+        self._refresh()
+        distanceFunction = distanceFunctionFor(distance, self.grid)
+        position = self.grid.position
+        goalPos = position(goal)
+        startCluster, goalCluster = self.clusterOf(start), self.clusterOf(goal)
+        #temporary edges from start to its cluster's entrances and from goal's entrances to goal
+        startReach = self._localSearch(start, startCluster)[0]
+        startEdges = {cell: startReach[cell] for cell in self._entrances.get(startCluster, {}) if cell in startReach}
+        goalReach = self._localSearch(goal, goalCluster)[0]
+        goalEdges = {cell: goalReach[cell] for cell in self._entrances.get(goalCluster, {}) if cell in goalReach}
+        direct = startReach.get(goal) if goalCluster == startCluster else None
+
+        frontier = OpenList()
+        frontier.push(start, distanceFunction(position(start), goalPos))
+        pathCost = {start: 0}
+        previous = {}
+        expanded = 0
+        pushes = 1
+        peak_frontier = 1
+        reopens = 0
+        while frontier:
+            currNode = frontier.pop()
+            if currNode == goal:
+                path = self._refine(reconstructPath(previous, goal), start, goal)
+                return SearchResult(path, pathCost[goal], expanded, pushes, peak_frontier, reopens)
+            expanded += 1
+            opened = []
+            if currNode == start:
+                edges = list(startEdges.items())
+                if direct is not None:
+                    edges.append((goal, direct))
+            else:
+                edges = list(self._intraFor(self.clusterOf(currNode)).get(currNode, {}).items())
+            edges.extend((partner, 1) for partner in self._partners.get(currNode, ()))
+            if currNode in goalEdges:
+                edges.append((goal, goalEdges[currNode]))
+            for adjacent, cost in edges:
+                temp_pathCost = pathCost[currNode] + cost
+                if temp_pathCost < pathCost.get(adjacent, float("inf")):
+                    newlyOpened = adjacent not in frontier
+                    if newlyOpened and adjacent in pathCost:
+                        reopens += 1
+                    previous[adjacent] = currNode
+                    pathCost[adjacent] = temp_pathCost
+                    frontier.push(adjacent, temp_pathCost + distanceFunction(position(adjacent), goalPos))
+                    pushes += 1
+                    if newlyOpened:
+                        peak_frontier = max(peak_frontier, len(frontier))
+                        opened.append(adjacent)
+            yield currNode, opened
+
+        return SearchResult(None, float("inf"), expanded, pushes, peak_frontier, reopens)
+
+    def query(self, start, goal, distance=Algorithm.MANHATTAN):
+        return finish(self.querySteps(start, goal, distance))
+
+    def _refine(self, abstractPath, start, goal):
+        #swap every abstract hop for the cells it stands for
+        path = [abstractPath[0]]
+        for source, target in zip(abstractPath, abstractPath[1:]):
+            if target in self._partners.get(source, ()):
+                path.append(target)
+                continue
+            #anything else stays inside one cluster (start/goal hops included)
+            previous = self._localSearch(source, self.clusterOf(source), target)[1]
+            path.extend(reconstructPath(previous, target)[1:])
+        return path
+
+
+#one hierarchy per board and cluster size, kept on the grid so it follows the board's walls
+def hierarchyFor(grid, clusterSize=DEFAULT_CLUSTER_SIZE):
+    key = ("hpa", clusterSize)
+    hierarchy = grid.derived.get(key)
+    if hierarchy is None:
+        hierarchy = grid.derived[key] = HierarchicalMap(grid, clusterSize)
+    return hierarchy
+
+
+def hpaSteps(grid, start, goal, distance=Algorithm.MANHATTAN):
+    return hierarchyFor(grid).querySteps(start, goal, distance)
@@ -0,0 +1,161 @@
+# This is the incremental replanning file
+# Lifelong Planning A* (Koenig & Likhachev). The planner keeps its g/rhs values between
+# runs and listens for wall changes on the grid; the next replan only repairs the cells
+# whose shortest distance those walls actually changed, instead of searching from scratch.
+# One planner serves one (start, goal, heuristic) query, see plannerFor().
+
+from videogame.openlist import OpenList
+from videogame.search import Algorithm, SearchResult, finish, heuristicArray, neighbors
+
+INF = float("inf")
+
+
+class LifelongPlanner:
+    """LPA* state for one query on one grid."""
+    def __init__(self, grid, start, goal, distance=Algorithm.MANHATTAN):
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        self.distance = distance
+        #set once a wall came down since the heuristic was built, only matters for landmarks
+        self.wallRemoved = False
+        self._heuristic = memoryview(heuristicArray(grid, goal, distance))
+        #g is the settled distance, rhs the one-step lookahead; missing means infinity
+        self._g = {}
+        self._rhs = {start: 0}
+        self._frontier = OpenList()
+        self._frontier.push(start, self._key(start))
+        #cells whose wall state changed since the last replan
+        self._changed = set()
+        grid.wallListeners.append(self.updateCell)
+
+    def close(self):
+        #stop listening to the grid, the planner is done with
+        if self.updateCell in self.grid.wallListeners:
+            self.grid.wallListeners.remove(self.updateCell)
+
+    def updateCell(self, index):
+        #grid wall listener, None means the whole board was rewritten
+        if index is None:
+            self._changed = None
+            self.wallRemoved = True
+            return
+        if not self.grid.isWall(index):
+            self.wallRemoved = True
+        if self._changed is not None:
+            self._changed.add(index)
+
+    def _key(self, index):
+        best = min(self._g.get(index, INF), self._rhs.get(index, INF))
+        return best + self._heuristic[index], best
+
+    def _updateVertex(self, index, moves, cols):
+        if index != self.start:
+            g = self._g
+            #rhs is the best one-step offer from a neighbor (walls have no moves, so no offers)
+            self._rhs[index] = min((g.get(adjacent, INF) + 1 for adjacent in neighbors(moves, cols, index)), default=INF)
+        if self._g.get(index, INF) != self._rhs.get(index, INF):
+            self._frontier.push(index, self._key(index))
+        else:
+            self._frontier.discard(index)
+
+    def _applyChanges(self, moves, cols):
+        changed = self._changed
+        self._changed = set()
+        if changed is None:
+            #bulk rewrite, nothing to salvage
+            self._g.clear()
+            self._rhs = {self.start: 0}
+            self._frontier = OpenList()
+            self._frontier.push(self.start, self._key(self.start))
+            return
+        rows = self.grid.rows
+        for index in changed:
+            #the edges into and out of this cell changed, so it and its neighbors need a new rhs
+            row, col = divmod(index, cols)
+            self._updateVertex(index, moves, cols)
+            if row > 0:
+                self._updateVertex(index - cols, moves, cols)
+            if row < rows - 1:
+                self._updateVertex(index + cols, moves, cols)
+            if col > 0:
+                self._updateVertex(index - 1, moves, cols)
+            if col < cols - 1:
+                self._updateVertex(index + 1, moves, cols)
+
+    def replanSteps(self):
+        """Step generator with the search.astarSteps contract; only repairs what changed."""
+        moves = memoryview(self.grid.moves)
+        cols = self.grid.cols
+        self._applyChanges(moves, cols)
+        frontier = self._frontier
+        g = self._g
+        rhs = self._rhs
+        goal = self.goal
+        expanded = 0
+        pushes = 0
+        peak_frontier = len(frontier)
+        reopens = 0
+        while frontier and (frontier.peekPriority() < self._key(goal) or g.get(goal, INF) != rhs.get(goal, INF)):
+            currNode = frontier.pop()
+            expanded += 1
+            before = len(frontier)
+            if g.get(currNode, INF) > rhs.get(currNode, INF):
+                #overconsistent: the cell got cheaper, settle it and tell the neighbors
+                g[currNode] = rhs[currNode]
+                for adjacent in neighbors(moves, cols, currNode):
+                    self._updateVertex(adjacent, moves, cols)
+            else:
+                #underconsistent: the cell got dearer (a wall cut it off), start it over
+                g.pop(currNode, None)
+                reopens += 1
+                self._updateVertex(currNode, moves, cols)
+                for adjacent in neighbors(moves, cols, currNode):
+                    self._updateVertex(adjacent, moves, cols)
+            opened = [adjacent for adjacent in neighbors(moves, cols, currNode) if adjacent in frontier]
+            pushes += max(0, len(frontier) - before)
+            peak_frontier = max(peak_frontier, len(frontier))
+            yield currNode, opened
+
+        cost = g.get(goal, INF)
+        if cost == INF:
+            return SearchResult(None, INF, expanded, pushes, peak_frontier, reopens)
+        return SearchResult(self._extractPath(moves, cols), cost, expanded, pushes, peak_frontier, reopens)
+
+    def replan(self):
+        return finish(self.replanSteps())
+
+    def _extractPath(self, moves, cols):
+        #walk back from the goal, always to the neighbor the distances say is one closer
+        g = self._g
+        path = [self.goal]
+        current = self.goal
+        while current != self.start:
+            current = min(neighbors(moves, cols, current), key=lambda adjacent: g.get(adjacent, INF))
+            path.append(current)
+        path.reverse()
+        return path
+
+
+#keeps one planner per grid, replaced whenever the query changes
+def plannerFor(grid, start, goal, distance=Algorithm.MANHATTAN):
+    planner = grid.derived.get("lpa")
+    #new walls only lengthen paths, so the old landmark bounds stay admissible and consistent;
+    #an opened wall can shorten them below the bound and the keys built on it can't be repaired
+    staleLandmarks = distance == Algorithm.LANDMARK and planner is not None and planner.wallRemoved
+    if planner is None or staleLandmarks or (planner.start, planner.goal, planner.distance) != (start, goal, distance):
+        if planner is not None:
+            planner.close()
+        planner = grid.derived["lpa"] = LifelongPlanner(grid, start, goal, distance)
+    return planner
+
+
+def lpaSteps(grid, start, goal, distance=Algorithm.MANHATTAN):
+    return plannerFor(grid, start, goal, distance).replanSteps()
+
+
+#drops the grid's planner so the next query starts from scratch
+def discardPlanner(grid):
+    planner = grid.derived.pop("lpa", None)
+    if planner is not None:
+        planner.close()
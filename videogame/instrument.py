@@ -0,0 +1,81 @@
+# This is the run statistics file
+# Counters and timings for one search in the visualizer: what the search itself reports
+# (expansions, pushes, reopens, peak frontier, path length) plus where the wall clock went
+# while it ran, split into searching, drawing and event handling with time.perf_counter.
+# Finished runs can be appended to a JSON lines log to compare builds against each other.
+
+import json
+import time
+
+
+class RunStats:
+    """Statistics for one search run, filled in by the game loop as the run goes."""
+    def __init__(self, engine, distance, board):
+        self.engine = engine.name
+        self.heuristic = distance.name
+        self.rows = board.rows
+        self.cols = board.cols
+        self.started = time.time()
+        self.search_seconds = 0
+        self.render_seconds = 0
+        self.event_seconds = 0
+        self.frames = 0
+        #expansions seen so far, the search's own totals replace this once it's done
+        self.steps = 0
+        self.cached = False
+        self.result = None
+
+    def finish(self, result, cached=False):
+        self.result = result
+        self.cached = cached
+
+    @property
+    def done(self):
+        return self.result is not None
+
+    def asDict(self):
+        row = {
+            "started": round(self.started, 3),
+            "engine": self.engine,
+            "heuristic": self.heuristic,
+            "rows": self.rows,
+            "cols": self.cols,
+            "cached": self.cached,
+            "frames": self.frames,
+            "search_seconds": round(self.search_seconds, 6),
+            "render_seconds": round(self.render_seconds, 6),
+            "event_seconds": round(self.event_seconds, 6),
+        }
+        result = self.result
+        if result is not None:
+            row.update({
+                "found": result.found,
+                "cost": result.cost if result.found else None,
+                "path_length": len(result.path) if result.found else None,
+                "expanded": result.expanded,
+                "pushes": result.pushes,
+                "reopens": result.reopens,
+                "peak_frontier": result.peak_frontier,
+            })
+        return row
+
+    def lines(self):
+        """Text for the on-screen overlay, one entry per line."""
+        result = self.result
+        lines = [f"{self.engine} / {self.heuristic} on {self.rows}x{self.cols}"]
+        if result is None:
+            lines.append(f"expanded {self.steps} so far")
+        else:
+            length = len(result.path) if result.found else "-"
+            lines.append(f"expanded {result.expanded}  pushes {result.pushes}  reopens {result.reopens}")
+            lines.append(f"peak frontier {result.peak_frontier}  path length {length}"
+                         + ("  (cached)" if self.cached else ""))
+        lines.append(f"search {self.search_seconds * 1000:.1f} ms  render {self.render_seconds * 1000:.1f} ms  "
+                     f"events {self.event_seconds * 1000:.1f} ms  ({self.frames} frames)")
+        return lines
+
+
+def appendLog(path, stats):
+    #one JSON object per line, so runs from different builds can simply be concatenated
+    with open(path, "a") as log:
+        log.write(json.dumps(stats.asDict()) + "\n")
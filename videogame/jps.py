@@ -0,0 +1,130 @@
+# This is the jump point search file
+# Jump Point Search for 4-connected, uniform cost grids. Straight runs of cells
+# that plain A* would push one by one get skipped over, and only the cells where
+# the path might turn (jump points) go in the open list.
+# Jumping and pruning rules adapted from PathFinding.js's never-move-diagonally finder.
+
+from videogame.grid import NORTH, SOUTH, WEST, EAST
+from videogame.openlist import OpenList
+from videogame.search import Algorithm, SearchResult, finish, heuristicArray, reconstructPath
+
+
+def _jumpHorizontal(moves, index, step, bit, goal):
+    #walk along the row until a wall, the goal or a cell where a vertical turn is forced
+    while moves[index] & bit:
+        behind = index
+        index += step
+        if index == goal:
+            return index
+        move = moves[index]
+        #a neighbor above/below that was blocked for the previous cell has to be looked at from here
+        if (move & NORTH and not moves[behind] & NORTH) or (move & SOUTH and not moves[behind] & SOUTH):
+            return index
+    return None
+
+
+def _jumpVertical(moves, index, step, bit, goal):
+    #walk along the column, stopping where a horizontal turn is forced or leads to a jump point
+    while moves[index] & bit:
+        behind = index
+        index += step
+        if index == goal:
+            return index
+        move = moves[index]
+        if (move & WEST and not moves[behind] & WEST) or (move & EAST and not moves[behind] & EAST):
+            return index
+        if (move & WEST and _jumpHorizontal(moves, index, -1, WEST, goal) is not None) or \
+                (move & EAST and _jumpHorizontal(moves, index, 1, EAST, goal) is not None):
+            return index
+    return None
+
+
+def _jump(moves, cols, index, bit, goal):
+    if bit == NORTH:
+        return _jumpVertical(moves, index, -cols, NORTH, goal)
+    if bit == SOUTH:
+        return _jumpVertical(moves, index, cols, SOUTH, goal)
+    if bit == WEST:
+        return _jumpHorizontal(moves, index, -1, WEST, goal)
+    return _jumpHorizontal(moves, index, 1, EAST, goal)
+
+
+def _directions(moves, cols, index, parent):
+    #pruned set of directions worth jumping in, given where we came from
+    move = moves[index]
+    if parent is None:
+        candidates = (NORTH, SOUTH, WEST, EAST)
+    elif index // cols == parent // cols:
+        #moving along a row: keep going, or turn up/down
+        candidates = (NORTH, SOUTH, EAST if index > parent else WEST)
+    else:
+        #moving along a column: keep going, or turn left/right
+        candidates = (WEST, EAST, SOUTH if index > parent else NORTH)
+    return [bit for bit in candidates if move & bit]
+
+
+def expandPath(jumpPoints, cols):
+    #fill in the straight runs between consecutive jump points
+    path = [jumpPoints[0]]
+    for target in jumpPoints[1:]:
+        current = path[-1]
+        if current // cols == target // cols:
+            step = 1 if target > current else -1
+        else:
+            step = cols if target > current else -cols
+        while current != target:
+            current += step
+            path.append(current)
+    return path
+
+
+#Same contract as search.astarSteps: yields (index, opened) per jump point expanded and
+#returns a SearchResult whose path lists every cell, not just the jump points.
+def jpsSteps(grid, start, goal, distance=Algorithm.MANHATTAN):
+    heuristic = memoryview(heuristicArray(grid, goal, distance))
+    position = grid.position
+    moves = memoryview(grid.moves)
+    cols = grid.cols
+    frontier = OpenList()
+    frontier.push(start, heuristic[start])
+    pathCost = {start: 0}
+    previous = {}
+    closed = set()
+    expanded = 0
+    pushes = 1
+    peak_frontier = 1
+    reopens = 0
+    while frontier:
+        currNode = frontier.pop()
+        if currNode == goal:
+            path = expandPath(reconstructPath(previous, goal), cols)
+            return SearchResult(path, pathCost[goal], expanded, pushes, peak_frontier, reopens)
+        closed.add(currNode)
+        expanded += 1
+        opened = []
+        currRow, currCol = position(currNode)
+        for bit in _directions(moves, cols, currNode, previous.get(currNode)):
+            jumpPoint = _jump(moves, cols, currNode, bit, goal)
+            if jumpPoint is None or jumpPoint in closed:
+                continue
+            jumpRow, jumpCol = position(jumpPoint)
+            #jumps are straight lines, so the cost is just how far we went
+            temp_pathCost = pathCost[currNode] + abs(jumpRow - currRow) + abs(jumpCol - currCol)
+            if temp_pathCost < pathCost.get(jumpPoint, float("inf")):
+                newlyOpened = jumpPoint not in frontier
+                if newlyOpened and jumpPoint in pathCost:
+                    reopens += 1
+                previous[jumpPoint] = currNode
+                pathCost[jumpPoint] = temp_pathCost
+                frontier.push(jumpPoint, temp_pathCost + heuristic[jumpPoint])
+                pushes += 1
+                if newlyOpened:
+                    peak_frontier = max(peak_frontier, len(frontier))
+                    opened.append(jumpPoint)
+        yield currNode, opened
+
+    return SearchResult(None, float("inf"), expanded, pushes, peak_frontier, reopens)
+
+
+def jps(grid, start, goal, distance=Algorithm.MANHATTAN):
+    return finish(jpsSteps(grid, start, goal, distance))
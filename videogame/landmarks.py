@@ -0,0 +1,100 @@
+# This is the landmark heuristic file
+# ALT heuristic: a handful of landmark cells each get a full distance field (see
+# videogame.flowfield), and the triangle inequality turns those into a lower bound that
+# knows about walls: |d(L, goal) - d(L, cell)| <= d(cell, goal) for every landmark L.
+# Landmarks are picked far apart (farthest point first) so they see the board from
+# different sides, and every walled-off region big enough to matter gets one of its
+# own. Tables live on the grid and are rebuilt lazily once the walls change.
+
+import numpy as np
+from videogame.flowfield import UNREACHABLE, distanceField
+from videogame.grid import CellState
+
+DEFAULT_LANDMARKS = 8
+#open regions smaller than this get no landmark of their own
+MIN_REGION_CELLS = 16
+UNSEEN = np.iinfo(np.int32).max
+
+
+class LandmarkTable:
+    """Distance fields from count landmarks, for the wall layout they were built on."""
+    def __init__(self, grid, count=DEFAULT_LANDMARKS):
+        self.version = grid.version
+        self.cols = grid.cols
+        self.landmarks = []
+        fields = []
+        #distance to the nearest landmark so far; UNSEEN marks cells no landmark reaches yet,
+        #so a part of the board walled off from the others still gets one of its own
+        nearest = np.full(len(grid), UNSEEN, dtype=np.int32)
+        nearest[grid.cells == CellState.WALL] = -1
+        pocket = None
+        while len(fields) < count:
+            landmark = int(np.argmax(nearest))
+            if nearest[landmark] <= 0:
+                #every open cell already is a landmark, or sits in a skipped pocket
+                break
+            if nearest[landmark] == UNSEEN:
+                region = distanceField(grid, landmark)
+                inRegion = region != UNREACHABLE
+                if np.count_nonzero(inRegion) < MIN_REGION_CELLS:
+                    #a search shut inside a pocket this small is cheap anyway, keep the slot
+                    nearest[inRegion] = -1
+                    pocket = landmark if pocket is None else pocket
+                    continue
+                #start the new region from its far side, like the first pick ever did
+                landmark = int(np.argmax(region))
+            self._add(grid, landmark, fields, nearest)
+        if not fields and pocket is not None:
+            #only pockets on the board: never end up without a landmark at all
+            self._add(grid, int(np.argmax(distanceField(grid, pocket))), fields, nearest)
+        self.distances = np.array(fields, dtype=np.int32).reshape(len(fields), len(grid))
+
+    def _add(self, grid, landmark, fields, nearest):
+        field = distanceField(grid, landmark)
+        self.landmarks.append(landmark)
+        fields.append(field)
+        reached = field != UNREACHABLE
+        np.minimum(nearest, field, out=nearest, where=reached)
+
+    def heuristicArray(self, goal):
+        """Bound from every cell to goal at once, as a float32 array (see search.heuristicArray)."""
+        bound = np.zeros(self.distances.shape[1], dtype=np.float32)
+        #one landmark at a time keeps the temporaries at a single row instead of K x N
+        for field in self.distances:
+            toGoal = field[goal]
+            if toGoal == UNREACHABLE:
+                #a landmark that can't reach the goal says nothing about it
+                continue
+            gap = np.subtract(field, toGoal)
+            np.abs(gap, out=gap)
+            gap[field == UNREACHABLE] = 0
+            np.maximum(bound, gap, out=bound)
+        return bound
+
+    def distanceFunction(self):
+        """Heuristic with the same (p1, p2) signature as search.manhattanDistance."""
+        cols = self.cols
+        fields = [memoryview(field) for field in self.distances]
+
+        def landmarkDistance(p1, p2):
+            first = p1[0] * cols + p1[1]
+            second = p2[0] * cols + p2[1]
+            best = 0
+            for field in fields:
+                toFirst = field[first]
+                toSecond = field[second]
+                #a landmark that can't reach both cells says nothing about them
+                if toFirst != UNREACHABLE and toSecond != UNREACHABLE:
+                    gap = abs(toFirst - toSecond)
+                    if gap > best:
+                        best = gap
+            return best
+        return landmarkDistance
+
+
+#the grid's landmark table, rebuilt on first use after the wall layout changed
+def landmarksFor(grid, count=DEFAULT_LANDMARKS):
+    table = grid.derived.get("landmarks")
+    if table is None or table.version != grid.version:
+        table = grid.derived["landmarks"] = LandmarkTable(grid, count)
+    return table
@@ -0,0 +1,139 @@
+# This is the map file
+# Boards on disk. The native format is a 32 byte header followed by the raw cells and
+# move masks, so loading is just np.memmap over the file: nothing is parsed and the OS
+# pages the board in as the search touches it. Moving AI benchmark maps (.map) and their
+# scenario lists (.scen) are read line by line, see https://movingai.com/benchmarks/formats.html
+
+import struct
+from collections import namedtuple
+import numpy as np
+from videogame.grid import CellState, Grid
+
+MAGIC = b"PFGRID"
+FORMAT_VERSION = 2
+#magic, format version, rows, cols, beginning and end index (-1 for none); 32 bytes,
+#then rows*cols cells, then rows*cols moves
+HEADER = struct.Struct("<6sHIIqq")
+#the endpoints sit in the header so opening a map never has to scan the cells for them
+NO_CELL = -1
+
+#Moving AI terrain: '.', 'G' and 'S' (swamp) can be walked on, everything else is a wall
+PASSABLE_TERRAIN = b".GS"
+
+
+def saveMap(grid, path):
+    """Write the board's walls, beginning and end (not the search coloring) in the binary format."""
+    cells = grid.cells
+    searchStates = (cells == CellState.OPEN) | (cells == CellState.CLOSED) | (cells == CellState.PATH)
+    ends = []
+    for state in (CellState.BEGINNING, CellState.END):
+        found = np.flatnonzero(cells == state)
+        ends.append(int(found[0]) if found.size else NO_CELL)
+    with open(path, "wb") as mapFile:
+        mapFile.write(HEADER.pack(MAGIC, FORMAT_VERSION, grid.rows, grid.cols, *ends))
+        np.where(searchStates, CellState.EMPTY, cells).astype(np.uint8).tofile(mapFile)
+        grid.moves.tofile(mapFile)
+
+
+def _readHeader(path):
+    with open(path, "rb") as mapFile:
+        header = mapFile.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a map file")
+    magic, version, rows, cols, beginning, end = HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a map file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} has map format version {version}, expected {FORMAT_VERSION}")
+    return rows, cols, beginning, end
+
+
+def loadMap(path, mode="c"):
+    """Memory-map a binary map file as a Grid.
+
+    mode is np.memmap's: "c" (default) keeps edits in memory, "r+" writes them
+    back to the file, "r" is read only. The stored beginning and end indices are
+    left in grid.derived["ends"], keyed by their CellState.
+    """
+    rows, cols, beginning, end = _readHeader(path)
+    size = rows * cols
+    cells = np.memmap(path, dtype=np.uint8, mode=mode, offset=HEADER.size, shape=(size,))
+    moves = np.memmap(path, dtype=np.uint8, mode=mode, offset=HEADER.size + size, shape=(size,))
+    board = Grid(rows, cols, cells=cells, moves=moves)
+    board.derived["ends"] = {state: index for state, index in ((CellState.BEGINNING, beginning), (CellState.END, end))
+                             if index != NO_CELL}
+    return board
+
+
+#Moving AI formats
+def loadMovingAIMap(path):
+    """Read a Moving AI .map file into a Grid, one line at a time.
+
+    The board is the map transposed: board rows are the map's x and columns its y,
+    since the camera draws rows along x (see videogame.camera). That way the map
+    shows up the right way round.
+    """
+    header = {}
+    with open(path, "rb") as mapFile:
+        for line in mapFile:
+            words = line.split()
+            if words == [b"map"]:
+                break
+            if len(words) == 2:
+                header[words[0].decode()] = words[1].decode()
+        else:
+            raise ValueError(f"{path} has no map section")
+        try:
+            height, width = int(header["height"]), int(header["width"])
+        except (KeyError, ValueError):
+            raise ValueError(f"{path} is missing its height/width header") from None
+        board = Grid(width, height)
+        cells = board.view()
+        #byte -> cell state lookup, so each line converts in one numpy call
+        terrain = np.full(256, CellState.WALL, dtype=np.uint8)
+        terrain[list(PASSABLE_TERRAIN)] = CellState.EMPTY
+        y = 0
+        for line in mapFile:
+            line = line.rstrip(b"\r\n")
+            if not line:
+                continue
+            if y == height or len(line) != width:
+                raise ValueError(f"{path}: map line {y + 1} doesn't fit a {width}x{height} map")
+            #one map line is one board column
+            cells[:, y] = terrain[np.frombuffer(line, dtype=np.uint8)]
+            y += 1
+        if y != height:
+            raise ValueError(f"{path}: expected {height} map lines, found {y}")
+    board.rebuildMoves()
+    return board
+
+
+#one benchmark query; start and goal are flat indices into the board loadMovingAIMap builds
+Scenario = namedtuple("Scenario", ["bucket", "map", "start", "goal", "optimal"])
+
+
+def readScenarios(path):
+    """Yield a Scenario for every line of a Moving AI .scen file.
+
+    optimal is the file's own figure, which assumes 8-connected octile moves and so
+    is only an upper bound for this visualizer's 4-connected paths.
+    """
+    with open(path) as scenFile:
+        for number, line in enumerate(scenFile, 1):
+            fields = line.split("\t") if "\t" in line else line.split()
+            if not fields or fields[0] == "version":
+                continue
+            if len(fields) != 9:
+                raise ValueError(f"{path}: line {number} should have 9 fields, found {len(fields)}")
+            bucket, mapName, _width, height, startX, startY, goalX, goalY, optimal = fields
+            #board rows are the map's x, see loadMovingAIMap
+            height = int(height)
+            yield Scenario(int(bucket), mapName, int(startX) * height + int(startY),
+                           int(goalX) * height + int(goalY), float(optimal))
+
+
+def openBoard(path):
+    #whichever loader fits the file name, for the --map option
+    if str(path).endswith(".map"):
+        return loadMovingAIMap(path)
+    return loadMap(path)
@@ -0,0 +1,61 @@
+# This is the open list file
+# A* frontier without the locking of queue.PriorityQueue. Built on heapq with
+# lazy invalidation: pushing an item that is already queued supersedes the old
+# entry (decrease-key), and stale entries are skipped when they reach the top.
+
+import heapq
+from itertools import count
+
+
+class OpenList:
+    """Min-priority queue of hashable items supporting decrease-key."""
+    def __init__(self):
+        self._heap = []
+        #item -> id of its live heap entry
+        self._entry = {}
+        #ids double as the FIFO tie breaker for equal priorities
+        self._ids = count()
+
+    def __len__(self):
+        return len(self._entry)
+
+    def __bool__(self):
+        return bool(self._entry)
+
+    def __contains__(self, item):
+        return item in self._entry
+
+    def __iter__(self):
+        #the queued items, in no particular order
+        return iter(self._entry)
+
+    def push(self, item, priority):
+        #adds the item, or moves it to the new priority if it is already queued
+        entry = next(self._ids)
+        self._entry[item] = entry
+        heapq.heappush(self._heap, (priority, entry, item))
+
+    def discard(self, item):
+        #takes the item out if it is queued, its heap entry goes stale and is skipped later
+        self._entry.pop(item, None)
+
+    def pop(self):
+        heap = self._heap
+        live = self._entry
+        while heap:
+            priority, entry, item = heapq.heappop(heap)
+            #superseded entries are simply dropped here
+            if live.get(item) == entry:
+                del live[item]
+                return item
+        raise IndexError("pop from an empty OpenList")
+
+    def peekPriority(self):
+        #priority of the next item pop() would return, clearing stale entries off the top
+        heap = self._heap
+        live = self._entry
+        while heap and live.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+        if not heap:
+            raise IndexError("peek from an empty OpenList")
+        return heap[0][0]
@@ -2,7 +2,7 @@
     is probably from an IRIX system circa 2005"""
 # courtesy of cpsc-386 2023, Michael Shafae
 
-from pygame import Color
+# pygame is only imported if a Color is actually asked for, the names below are plain tuples.
 
 
 def _clamp(val: int, min_value=0, max_value=255) -> int:
@@ -44,6 +44,7 @@ def diff_color(color_a, color_b):
 
 def tuple_to_color(color_tuple):
     """Given a tuple representing a color, return a Pygame color contructed from that tuple."""
+    from pygame import Color
     return Color(*color_tuple)
 
 
@@ -0,0 +1,242 @@
+# This is the headless search file
+# Nothing in here imports pygame, so searches can run without a display
+# (batch jobs, benchmarks) and the visualizer just consumes the search steps.
+
+import math
+from enum import Enum
+import numpy as np
+from videogame.grid import NORTH, SOUTH, WEST, EAST
+from videogame.openlist import OpenList
+
+
+class Algorithm(Enum):
+    MANHATTAN = 0
+    EUCLIDEAN = 1
+    CHEBYSHEV = 2
+    #precomputed landmark (ALT) bounds, aware of walls; see videogame.landmarks
+    LANDMARK = 3
+
+
+#Heuristic functions
+def manhattanDistance(p1, p2):
+    x1, y1 = p1
+    x2, y2 = p2
+    return abs(x1 - x2) + abs(y1 - y2)
+
+def euclideanDistance(p1, p2):
+    x1, y1 = p1
+    x2, y2 = p2
+    return math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
+
+def chebyshevDistance(p1, p2):
+    x1, y1 = p1
+    x2, y2 = p2
+    return max(abs(x1 - x2), abs(y1 - y2))
+
+
+def distanceFunctionFor(distance, grid=None):
+    #switch between heuristic types; the landmark heuristic needs the grid it was built for
+    if distance == Algorithm.MANHATTAN:
+        return manhattanDistance
+    elif distance == Algorithm.EUCLIDEAN:
+        return euclideanDistance
+    elif distance == Algorithm.CHEBYSHEV:
+        return chebyshevDistance
+    elif distance == Algorithm.LANDMARK:
+        if grid is None:
+            raise ValueError("The landmark heuristic needs a grid")
+        #imported here, landmarks builds on flowfield which imports this module
+        from videogame.landmarks import landmarksFor
+        return landmarksFor(grid).distanceFunction()
+    raise ValueError(f"Unknown heuristic: {distance}")
+
+
+def heuristicArray(grid, goal, distance=Algorithm.MANHATTAN):
+    """Heuristic from every cell to goal as one float32 array, indexed by flat cell index.
+
+    Built once per query with numpy so the search loop does a lookup instead of a
+    Python call with two position tuples for every push.
+    """
+    if distance == Algorithm.LANDMARK:
+        from videogame.landmarks import landmarksFor
+        return landmarksFor(grid).heuristicArray(goal)
+    goalRow, goalCol = grid.position(goal)
+    rowGap = np.abs(np.arange(grid.rows, dtype=np.float32) - goalRow)[:, None]
+    colGap = np.abs(np.arange(grid.cols, dtype=np.float32) - goalCol)[None, :]
+    if distance == Algorithm.MANHATTAN:
+        estimates = rowGap + colGap
+    elif distance == Algorithm.EUCLIDEAN:
+        estimates = np.hypot(rowGap, colGap)
+    elif distance == Algorithm.CHEBYSHEV:
+        estimates = np.maximum(rowGap, colGap)
+    else:
+        raise ValueError(f"Unknown heuristic: {distance}")
+    return estimates.ravel()
+
+
+class SearchResult:
+    """Outcome of one search: the path (start to goal) plus expansion stats."""
+    def __init__(self, path, cost, expanded, pushes, peak_frontier, reopens=0):
+        self.path = path
+        self.cost = cost
+        self.expanded = expanded
+        self.pushes = pushes
+        self.peak_frontier = peak_frontier
+        #cells put back in the frontier after they had already been expanded
+        self.reopens = reopens
+
+    @property
+    def found(self):
+        return self.path is not None
+
+    def __repr__(self):
+        return (f"SearchResult(found={self.found}, cost={self.cost}, expanded={self.expanded}, "
+                f"pushes={self.pushes}, peak_frontier={self.peak_frontier}, reopens={self.reopens})")
+
+
+def reconstructPath(previous, current):
+    ##go backwards through previous map to rebuild the path, then flip it so it starts at the beginning.
+    path = [current]
+    while current in previous:
+        current = previous[current]
+        path.append(current)
+    path.reverse()
+    return path
+
+
+def neighbors(moves, cols, index):
+    #moves is a memoryview of Grid.moves, so this is a few bit tests per cell
+    move = moves[index]
+    #north, south, left, right
+    if move & NORTH:
+        yield index - cols
+    if move & SOUTH:
+        yield index + cols
+    if move & WEST:
+        yield index - 1
+    if move & EAST:
+        yield index + 1
+
+
+#Drives a step generator to the end and returns its SearchResult.
+def finish(steps):
+    try:
+        while True:
+            next(steps)
+    except StopIteration as done:
+        return done.value
+
+
+#A star algorithm modified from example from lecture and wikipedia implementation in python
+#grid is a videogame.grid.Grid, start/goal and everything reported back are flat cell indices.
+#This is a generator: every expansion yields (index, opened) where opened lists the cells
+#that just joined the frontier, and the SearchResult comes back as the StopIteration value.
+#Callers decide how many steps to take at a time; astar() just runs it to the end.
+def astarSteps(grid, start, goal, distance=Algorithm.MANHATTAN):
+    heuristic = memoryview(heuristicArray(grid, goal, distance))
+    moves = memoryview(grid.moves)
+    cols = grid.cols
+    #setup frontier to keep open nodes, equal scores pop in the order they were added
+    frontier = OpenList()
+    frontier.push(start, heuristic[start])
+    #missing entries are treated as an infinite path cost
+    pathCost = {start: 0}
+    previous = {}
+    expanded = 0
+    pushes = 1
+    peak_frontier = 1
+    reopens = 0
+    #while there are still nodes in frontier, keep running
+    while frontier:
+        currNode = frontier.pop()
+        #we're done and can now rebuild the final path
+        if currNode == goal:
+            return SearchResult(reconstructPath(previous, goal), pathCost[goal], expanded, pushes, peak_frontier, reopens)
+        expanded += 1
+        opened = []
+        #go through all adjacent nodes and determine if its a better path in terms of cost
+        for adjacent in neighbors(moves, cols, currNode):
+            #since we are moving only one node ahead, we can add 1 to pathcost.
+            temp_pathCost = pathCost[currNode] + 1
+            #if this currNode pathcost is smaller than the adjacents, make this the path we choose
+            if temp_pathCost < pathCost.get(adjacent, float("inf")):
+                newlyOpened = adjacent not in frontier
+                #had a cost but isn't queued, so it was expanded already
+                if newlyOpened and adjacent in pathCost:
+                    reopens += 1
+                previous[adjacent] = currNode
+                pathCost[adjacent] = temp_pathCost
+                #pushing a node that is already queued lowers its score (decrease-key)
+                frontier.push(adjacent, temp_pathCost + heuristic[adjacent])
+                pushes += 1
+                if newlyOpened:
+                    peak_frontier = max(peak_frontier, len(frontier))
+                    opened.append(adjacent)
+        yield currNode, opened
+
+    return SearchResult(None, float("inf"), expanded, pushes, peak_frontier, reopens)
+
+
+def astar(grid, start, goal, distance=Algorithm.MANHATTAN):
+    return finish(astarSteps(grid, start, goal, distance))
+
+
+#Bidirectional A*: one frontier grows from the start toward the goal, the other from the goal
+#back toward the start, always expanding whichever frontier is smaller. best tracks the
+#cheapest start-to-goal path seen where the two searches touch. Once either frontier's
+#lowest score reaches best nothing cheaper can exist (the heuristics are consistent), so we stop.
+#Same step contract as astarSteps.
+def bidirectionalSteps(grid, start, goal, distance=Algorithm.MANHATTAN):
+    moves = memoryview(grid.moves)
+    cols = grid.cols
+    #index 0 searches forward (aiming at goal), index 1 backward (aiming at start)
+    heuristics = (memoryview(heuristicArray(grid, goal, distance)), memoryview(heuristicArray(grid, start, distance)))
+    frontiers = (OpenList(), OpenList())
+    frontiers[0].push(start, heuristics[0][start])
+    frontiers[1].push(goal, heuristics[1][goal])
+    pathCosts = ({start: 0}, {goal: 0})
+    previous = ({}, {})
+    best = 0 if start == goal else float("inf")
+    meet = start if start == goal else None
+    expanded = 0
+    pushes = 2
+    peak_frontier = 2
+    reopens = 0
+    while frontiers[0] and frontiers[1]:
+        if max(frontiers[0].peekPriority(), frontiers[1].peekPriority()) >= best:
+            break
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        frontier, pathCost, heuristic = frontiers[side], pathCosts[side], heuristics[side]
+        otherCost = pathCosts[1 - side]
+        currNode = frontier.pop()
+        expanded += 1
+        opened = []
+        for adjacent in neighbors(moves, cols, currNode):
+            temp_pathCost = pathCost[currNode] + 1
+            if temp_pathCost < pathCost.get(adjacent, float("inf")):
+                newlyOpened = adjacent not in frontier
+                if newlyOpened and adjacent in pathCost:
+                    reopens += 1
+                previous[side][adjacent] = currNode
+                pathCost[adjacent] = temp_pathCost
+                frontier.push(adjacent, temp_pathCost + heuristic[adjacent])
+                pushes += 1
+                if newlyOpened:
+                    peak_frontier = max(peak_frontier, len(frontiers[0]) + len(frontiers[1]))
+                    opened.append(adjacent)
+                #the other search has been here too, so this is a whole start-to-goal path
+                if adjacent in otherCost and temp_pathCost + otherCost[adjacent] < best:
+                    best = temp_pathCost + otherCost[adjacent]
+                    meet = adjacent
+        yield currNode, opened
+
+    if meet is None:
+        return SearchResult(None, float("inf"), expanded, pushes, peak_frontier, reopens)
+    #forward half runs start..meet, the backward half is rebuilt the same way and flipped
+    path = reconstructPath(previous[0], meet)
+    path.extend(reversed(reconstructPath(previous[1], meet)[:-1]))
+    return SearchResult(path, best, expanded, pushes, peak_frontier, reopens)
+
+
+def bidirectional(grid, start, goal, distance=Algorithm.MANHATTAN):
+    return finish(bidirectionalSteps(grid, start, goal, distance))